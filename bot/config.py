@@ -8,6 +8,25 @@ load_dotenv()
 # ========================================
 HOST = os.getenv("HOST", "localhost")
 PORT = int(os.getenv("PORT", "8765"))
+# Procesos trabajadores que comparten el puerto (requiere SO_REUSEPORT, p. ej. Linux)
+WORKERS = int(os.getenv("WORKERS", "1"))
+
+# ========================================
+# TRANSPORTE WEBSOCKET
+# ========================================
+# Compresión permessage-deflate (desactivada: los mensajes son muy pequeños)
+WS_COMPRESSION = os.getenv("WS_COMPRESSION", "false").lower() == "true"
+# Pings de keepalive del protocolo (segundos, 0 = desactivados)
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "20"))
+WS_PING_TIMEOUT = float(os.getenv("WS_PING_TIMEOUT", "20"))
+# Tamaño máximo de mensaje entrante (bytes) y mensajes entrantes en cola (0 = sin límite)
+WS_MAX_SIZE = int(os.getenv("WS_MAX_SIZE", str(1024 * 1024)))
+WS_MAX_QUEUE = int(os.getenv("WS_MAX_QUEUE", "16"))
+# Bytes en el búfer de escritura a partir de los que send() espera a que se vacíe
+WS_WRITE_LIMIT = int(os.getenv("WS_WRITE_LIMIT", "32768"))
+TCP_NODELAY = os.getenv("TCP_NODELAY", "true").lower() == "true"
+# Sonda de ida y vuelta servidor → userscript → servidor (segundos entre sondas, 0 = desactivada)
+RTT_PROBE_INTERVAL = float(os.getenv("RTT_PROBE_INTERVAL", "0"))
 
 # ========================================
 # RUTAS DEL SISTEMA
@@ -21,6 +40,71 @@ DICT_PATH = os.path.join(DICT_DIR, "es.txt")
 LOG_FILE = os.path.join(LOGS_DIR, "bot_server.log")
 LOG_PACKETS_FILE = os.path.join(LOGS_DIR, "packets.log")
 
+# ========================================
+# CACHÉ DE DICCIONARIOS
+# ========================================
+DICT_CACHE_MAX_MB = int(os.getenv("DICT_CACHE_MAX_MB", "256"))
+PRELOAD_LANGUAGES = [lang.strip() for lang in os.getenv("PRELOAD_LANGUAGES", "").split(",") if lang.strip()]
+# Sílabas con al menos tantas respuestas reciben una tabla precalculada en el .bin (0 = ninguna)
+RANK_MIN_CANDIDATES = int(os.getenv("RANK_MIN_CANDIDATES", "50"))
+# Usar esas tablas al resolver con las estrategias "longest" y "shortest"
+RANKED_TABLES = os.getenv("RANKED_TABLES", "true").lower() == "true"
+# Segundos entre comprobaciones de cambios en los .txt de DICT_DIR para recargarlos en caliente (0 = desactivado)
+DICT_WATCH_INTERVAL = float(os.getenv("DICT_WATCH_INTERVAL", "2"))
+
+# ========================================
+# DIARIO DE CAMBIOS DEL DICCIONARIO
+# ========================================
+JOURNAL_FSYNC_BATCH = int(os.getenv("JOURNAL_FSYNC_BATCH", "16"))
+JOURNAL_FSYNC_INTERVAL = float(os.getenv("JOURNAL_FSYNC_INTERVAL", "2.0"))
+JOURNAL_COMPACT_THRESHOLD = int(os.getenv("JOURNAL_COMPACT_THRESHOLD", "500"))
+
+# ========================================
+# ARRANQUE EN CALIENTE
+# ========================================
+# Guardar el estado de las sesiones (palabras usadas, alfabeto bonus, configuración)
+# para retomar las partidas tras un reinicio
+SESSION_SNAPSHOTS = os.getenv("SESSION_SNAPSHOTS", "true").lower() == "true"
+# Segundos entre instantáneas (0 = solo al desconectar y al apagar)
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "30"))
+# Antigüedad máxima (segundos) de una instantánea para restaurarla
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE", "900"))
+SNAPSHOT_FILE = os.getenv("SNAPSHOT_FILE") or os.path.join(DATA_DIR, "sessions.snap")
+# Idiomas usados más recientemente que se cargan antes de aceptar conexiones (0 = ninguno)
+WARM_START_LANGUAGES = int(os.getenv("WARM_START_LANGUAGES", "1"))
+
+# ========================================
+# ESTADÍSTICAS DE PALABRAS
+# ========================================
+# Guardar cuántas veces se aceptó/rechazó cada palabra (es.stats junto al diccionario)
+WORD_STATS = os.getenv("WORD_STATS", "true").lower() == "true"
+# Preferir, dentro de cada estrategia, las palabras ya aceptadas y evitar las más rechazadas
+PREFER_CONFIDENT_WORDS = os.getenv("PREFER_CONFIDENT_WORDS", "true").lower() == "true"
+# Aceptaciones necesarias para considerar segura una palabra
+CONFIDENT_MIN_ACCEPTS = int(os.getenv("CONFIDENT_MIN_ACCEPTS", "1"))
+
+# ========================================
+# RENDIMIENTO DEL EVENT LOOP
+# ========================================
+# Hilos para resolver y guardar fuera del event loop (0 = ejecutar en el propio loop)
+SOLVER_THREADS = int(os.getenv("SOLVER_THREADS", "1"))
+# Intervalo de muestreo y umbral de aviso del monitor de retraso (0 = desactivado)
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+LOOP_LAG_WARN_MS = float(os.getenv("LOOP_LAG_WARN_MS", "100"))
+# Precalcular respuestas durante los turnos de otros jugadores, y cuántas guardar
+SPECULATIVE_SOLVE = os.getenv("SPECULATIVE_SOLVE", "true").lower() == "true"
+SPECULATION_DEPTH = int(os.getenv("SPECULATION_DEPTH", "20"))
+
+# ========================================
+# MÉTRICAS
+# ========================================
+# Endpoint HTTP local con las métricas en formato Prometheus (0 = desactivado)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# Volcado periódico de las métricas a JSON (0 = desactivado)
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "0"))
+METRICS_DUMP_FILE = os.getenv("METRICS_DUMP_FILE") or os.path.join(LOGS_DIR, "metrics.json")
+
 # ========================================
 # SIMULACIÓN DE COMPORTAMIENTO HUMANO
 # ========================================
@@ -28,8 +112,23 @@ MIN_TYPING_DELAY = float(os.getenv("MIN_TYPING_DELAY", "0.05"))
 MAX_TYPING_DELAY = float(os.getenv("MAX_TYPING_DELAY", "0.15"))
 START_DELAY_MIN = float(os.getenv("START_DELAY_MIN", "0.5"))
 START_DELAY_MAX = float(os.getenv("START_DELAY_MAX", "1.5"))
+# Duración mínima del turno si las reglas de la sala no la indican (la bomba nunca explota antes)
+DEFAULT_MIN_TURN_DURATION = float(os.getenv("DEFAULT_MIN_TURN_DURATION", "5"))
+# Margen (segundos) que se deja antes de ese plazo al comprimir pensar y teclear
+TURN_SAFETY_MARGIN = float(os.getenv("TURN_SAFETY_MARGIN", "0.3"))
+# Enviar cada palabra como un plan de tecleo (un mensaje) si el userscript lo soporta
+TYPING_PLANS = os.getenv("TYPING_PLANS", "true").lower() == "true"
+# Margen (segundos) sobre la duración del plan para esperar su confirmación
+TYPING_PLAN_ACK_MARGIN = float(os.getenv("TYPING_PLAN_ACK_MARGIN", "2.0"))
 
 # ========================================
 # CONFIGURACIÓN DE LOGGING
 # ========================================
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Rotación de bot_server.log y packets.log: por tiempo si LOG_ROTATE_WHEN está definido
+# (p. ej. "midnight", "H"), si no por tamaño
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")
+# Captura de paquetes en packets.log (false = desactivada por completo)
+PACKET_CAPTURE = os.getenv("PACKET_CAPTURE", "true").lower() == "true"
@@ -0,0 +1,514 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from array import array
+import numpy as np
+from bot.config import RANK_MIN_CANDIDATES
+
+# ========================================
+# MÁSCARAS DE LETRAS
+# ========================================
+# Cada letra ocupa un bit de una máscara de 64 bits: el alfabeto latino
+# básico más las letras acentuadas de los idiomas soportados.
+LETTERS = "abcdefghijklmnopqrstuvwxyz" "áéíóúüñàèìòùâêîôûäöëïçãõßœæÿ"
+LETTER_BITS = {letter: 1 << bit for bit, letter in enumerate(LETTERS)}
+
+
+def letter_mask(word):
+    """Máscara con un bit por cada letra distinta de la palabra."""
+    mask = 0
+    for c in set(word):
+        mask |= LETTER_BITS.get(c, 0)
+    return mask
+
+# ========================================
+# ALMACÉN COMPACTO DE PALABRAS
+# ========================================
+class WordStore:
+    """
+    Almacén de palabras en un único buffer UTF-8 contiguo con un array de
+    offsets. Cada palabra tiene un ID entero estable, la pertenencia se
+    resuelve con una tabla hash de direccionamiento abierto y el borrado
+    deja una lápida (el ID no se reutiliza).
+
+    Por cada palabra se guardan además su máscara de letras y su longitud,
+    que el solucionador usa para puntuar candidatos de forma vectorizada.
+
+    Sobre un binario mapeado los buffers son de solo lectura y se comparten
+    entre procesos: las palabras aprendidas van a una capa aparte (IDs a
+    partir de `base_count`) que se integra en el binario al compactar.
+
+    El almacén se comparte entre sesiones: quien lo lea o modifique desde
+    varios hilos debe hacerlo con `lock`.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offsets = array("I", [0])
+        self.letter_masks = array("Q")
+        self.lengths = array("H")
+        self.alive = bytearray()
+        self.table = array("I", bytes(4 * 8))
+        self.mask = 7
+        self.live_count = 0
+        self.source = None
+        self.lock = threading.RLock()
+        # Capa de palabras aprendidas sobre buffers de solo lectura (vacía si el almacén es escribible)
+        self.read_only = False
+        self.base_count = 0
+        self.extra_buffer = bytearray()
+        self.extra_offsets = array("I", [0])
+        self.extra_masks = array("Q")
+        self.extra_lengths = array("H")
+        self.extra_ids = {}
+
+    @classmethod
+    def from_buffers(cls, buffer, offsets, table, letter_masks, lengths, source=None):
+        """
+        Crea un almacén sobre buffers de solo lectura (p. ej. un mmap). Nunca
+        se copian: lo que se aprenda después va a la capa de palabras nuevas.
+        """
+        store = cls()
+        store.buffer = buffer
+        store.offsets = offsets
+        store.table = table
+        store.letter_masks = letter_masks
+        store.lengths = lengths
+        store.mask = len(table) - 1
+        store.live_count = len(offsets) - 1
+        store.alive = bytearray(b"\x01") * store.live_count
+        store.source = source
+        store.read_only = True
+        store.base_count = store.live_count
+        return store
+
+    # --- Tabla hash ---
+    @staticmethod
+    def _hash(data):
+        return zlib.crc32(data)
+
+    def _probe(self, data):
+        """Devuelve (slot, word_id) para la palabra; word_id es -1 si no existe."""
+        table, mask, buffer, offsets = self.table, self.mask, self.buffer, self.offsets
+        slot = self._hash(data) & mask
+        while True:
+            entry = table[slot]
+            if entry == 0:
+                return slot, self.extra_ids.get(data, -1)
+            word_id = entry - 1
+            if buffer[offsets[word_id]:offsets[word_id + 1]] == data:
+                return slot, word_id
+            slot = (slot + 1) & mask
+
+    def _resize(self, capacity):
+        size = 8
+        while size < capacity * 2:
+            size <<= 1
+        self.table = array("I", bytes(4 * size))
+        self.mask = size - 1
+        table, mask, buffer, offsets = self.table, self.mask, self.buffer, self.offsets
+        for word_id in range(len(offsets) - 1):
+            slot = self._hash(buffer[offsets[word_id]:offsets[word_id + 1]]) & mask
+            while table[slot]:
+                slot = (slot + 1) & mask
+            table[slot] = word_id + 1
+
+    def reserve(self, capacity):
+        """Prepara la tabla para al menos `capacity` palabras sin rehash."""
+        if capacity * 2 > self.mask + 1:
+            self._resize(capacity)
+
+    # --- API pública ---
+    def add(self, word):
+        """Añade una palabra. Devuelve (word_id, es_nueva). Revive palabras borradas."""
+        data = word.encode("utf-8")
+        slot, word_id = self._probe(data)
+        if word_id >= 0:
+            if self.alive[word_id]:
+                return word_id, False
+            self.alive[word_id] = 1
+            self.live_count += 1
+            return word_id, True
+
+        if self.read_only:
+            return self._add_extra(word, data), True
+
+        word_id = len(self.offsets) - 1
+        self.buffer += data
+        self.offsets.append(len(self.buffer))
+        self.letter_masks.append(letter_mask(word))
+        self.lengths.append(min(len(word), 0xFFFF))
+        self.alive.append(1)
+        self.table[slot] = word_id + 1
+        self.live_count += 1
+        if (word_id + 1) * 2 > self.mask + 1:
+            self._resize(word_id + 1)
+        return word_id, True
+
+    def _add_extra(self, word, data):
+        """Añade una palabra a la capa de aprendidas (los buffers base no se tocan)."""
+        word_id = self.base_count + len(self.extra_lengths)
+        self.extra_buffer += data
+        self.extra_offsets.append(len(self.extra_buffer))
+        self.extra_masks.append(letter_mask(word))
+        self.extra_lengths.append(min(len(word), 0xFFFF))
+        self.extra_ids[data] = word_id
+        self.alive.append(1)
+        self.live_count += 1
+        return word_id
+
+    def remove(self, word):
+        """Marca la palabra como borrada (lápida). Devuelve True si existía."""
+        word_id = self.find(word)
+        if word_id < 0:
+            return False
+        self.alive[word_id] = 0
+        self.live_count -= 1
+        return True
+
+    def find(self, word):
+        """Devuelve el ID de una palabra viva o -1."""
+        _, word_id = self._probe(word.encode("utf-8"))
+        if word_id >= 0 and self.alive[word_id]:
+            return word_id
+        return -1
+
+    def is_alive(self, word_id):
+        return self.alive[word_id] == 1
+
+    def word(self, word_id):
+        if self.read_only and word_id >= self.base_count:
+            offsets = self.extra_offsets
+            word_id -= self.base_count
+            return str(self.extra_buffer[offsets[word_id]:offsets[word_id + 1]], "utf-8")
+        offsets = self.offsets
+        return str(self.buffer[offsets[word_id]:offsets[word_id + 1]], "utf-8")
+
+    def length(self, word_id):
+        """Longitud (en caracteres) de la palabra con ese ID."""
+        if word_id >= len(self.lengths):
+            return self.extra_lengths[word_id - self.base_count]
+        return self.lengths[word_id]
+
+    def lengths_of(self, ids):
+        """Longitudes (uint16) de un array de IDs."""
+        return self._gather(self.lengths, self.extra_lengths, np.uint16, ids)
+
+    def masks_of(self, ids):
+        """Máscaras de letras (uint64) de un array de IDs."""
+        return self._gather(self.letter_masks, self.extra_masks, np.uint64, ids)
+
+    def _gather(self, base, extra, dtype, ids):
+        base = np.frombuffer(base, dtype=dtype)
+        if not len(extra):
+            return base[ids]
+        values = np.empty(len(ids), dtype=dtype)
+        in_base = ids < self.base_count
+        values[in_base] = base[ids[in_base]]
+        values[~in_base] = np.frombuffer(extra, dtype=dtype)[ids[~in_base] - self.base_count]
+        return values
+
+    @property
+    def id_count(self):
+        """Número total de IDs asignados, incluidas las lápidas."""
+        return len(self.offsets) - 1 + len(self.extra_lengths)
+
+    def items(self):
+        """Itera (word_id, palabra) sobre las palabras vivas."""
+        alive = self.alive
+        for word_id in range(self.id_count):
+            if alive[word_id]:
+                yield word_id, self.word(word_id)
+
+    @property
+    def nbytes(self):
+        """Memoria aproximada ocupada por el almacén."""
+        return (len(self.buffer) + 4 * (len(self.offsets) + len(self.table))
+                + 8 * len(self.letter_masks) + 2 * len(self.lengths) + len(self.alive)
+                + len(self.extra_buffer) + 14 * len(self.extra_lengths))
+
+    def __len__(self):
+        return self.live_count
+
+    def __contains__(self, word):
+        return self.find(word) >= 0
+
+    def __iter__(self):
+        for _, word in self.items():
+            yield word
+
+
+# ========================================
+# ÍNDICE INVERTIDO DE SUBCADENAS
+# ========================================
+class SubstringIndex:
+    """
+    Índice de cada subcadena de 1 a 3 caracteres a los IDs de las palabras que
+    la contienen. Las subcadenas con muchas respuestas tienen además una tabla
+    precalculada con sus IDs ordenados por longitud (y por ID a igual
+    longitud), que sirve tanto para "longest" como para "shortest".
+    """
+
+    MAX_GRAM = 3
+    _EMPTY = array("I")
+
+    def __init__(self):
+        self.postings = {}
+        self.rankings = {}
+        # IDs cubiertos por las tablas: los aprendidos después quedan al final de cada lista
+        self.ranked_ids = 0
+        # IDs aprendidos de las listas que viven en un mmap (no se copian: se añaden al consultar)
+        self.extra = {}
+
+    @classmethod
+    def _grams(cls, word):
+        """Devuelve las subcadenas distintas de 1..MAX_GRAM caracteres de una palabra."""
+        length = len(word)
+        return {word[i:i + n] for n in range(1, cls.MAX_GRAM + 1) for i in range(length - n + 1)}
+
+    def build(self, items):
+        """Reconstruye el índice completo a partir de pares (word_id, palabra)."""
+        postings = {}
+        for word_id, word in items:
+            for gram in self._grams(word):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(word_id)
+        self.postings = postings
+
+    def build_rankings(self, lengths, id_count, min_candidates=RANK_MIN_CANDIDATES):
+        """Precalcula las tablas ordenadas de las subcadenas con al menos `min_candidates` IDs."""
+        rankings = {}
+        if min_candidates > 0:
+            lengths = np.frombuffer(lengths, dtype=np.uint16)
+            for gram, posting in self.postings.items():
+                if len(posting) >= min_candidates:
+                    ids = np.frombuffer(posting, dtype=np.uint32)
+                    # Las listas están ordenadas por ID: el orden estable conserva el desempate
+                    ranked = ids[np.argsort(lengths[ids], kind="stable")]
+                    rankings[gram] = array("I", ranked.tobytes())
+        self.rankings = rankings
+        self.ranked_ids = id_count
+
+    @classmethod
+    def from_postings(cls, postings, rankings=None, ranked_ids=0):
+        """Crea un índice sobre listas de solo lectura (vistas de un mmap)."""
+        index = cls()
+        index.postings = postings
+        index.rankings = rankings or {}
+        index.ranked_ids = ranked_ids
+        return index
+
+    def add(self, word_id, word):
+        """Añade una palabra nueva al índice (los IDs siempre crecen, las listas quedan ordenadas)."""
+        for gram in self._grams(word):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("I")
+            elif not isinstance(posting, array):
+                # La lista original vive en el mmap: el ID va a la capa de aprendidas
+                posting = self.extra.get(gram)
+                if posting is None:
+                    posting = self.extra[gram] = array("I")
+            posting.append(word_id)
+
+    def clear(self):
+        self.postings = {}
+        self.rankings = {}
+        self.ranked_ids = 0
+        self.extra = {}
+
+    @property
+    def nbytes(self):
+        """Memoria aproximada ocupada por las listas de IDs."""
+        return sum(4 * len(posting) for postings in (self.postings, self.rankings, self.extra) for posting in postings.values())
+
+    def lookup(self, syllable):
+        """
+        Devuelve los IDs candidatos para una sílaba. Para sílabas de más de
+        MAX_GRAM caracteres se usa el prefijo y el llamante debe verificar.
+        """
+        gram = syllable[:self.MAX_GRAM]
+        posting = self.postings.get(gram, self._EMPTY)
+        extra = self.extra.get(gram)
+        if extra is None:
+            return posting
+        # Copia temporal: lista del mmap + IDs aprendidos (mayores, sigue ordenada)
+        merged = array("I")
+        merged.frombytes(posting.cast("B"))
+        merged.extend(extra)
+        return merged
+
+    def ranking(self, syllable):
+        """Tabla precalculada de la sílaba (IDs por longitud ascendente) o None si no tiene."""
+        return self.rankings.get(syllable)
+
+
+# ========================================
+# FORMATO BINARIO PRECOMPILADO
+# ========================================
+# Cabecera:
+#   magic, versión, orden de bytes, tamaño y mtime del .txt de origen,
+#   nº de IDs, bytes del buffer, tamaño de la tabla hash,
+#   nº de sílabas, bytes del buffer de sílabas, nº total de entradas del índice,
+#   nº de tablas ordenadas, nº total de entradas de las tablas.
+# Secciones (alineadas a 8 bytes), en este orden:
+#   buffer de palabras, offsets[n+1], tabla hash, máscaras de letras[n],
+#   longitudes[n], buffer de sílabas, offsets de sílabas[g+1],
+#   inicios de listas[g+1], listas de IDs, sílaba de cada tabla[r],
+#   inicios de tablas[r+1], tablas de IDs.
+BINARY_MAGIC = b"JKLMDICT"
+BINARY_VERSION = 3
+BINARY_SUFFIX = ".bin"
+_HEADER = struct.Struct("<8sIBxxxQqIIIIIIII")
+_BYTEORDER = 0 if sys.byteorder == "little" else 1
+
+
+def binary_path_for(txt_path):
+    return os.path.splitext(txt_path)[0] + BINARY_SUFFIX
+
+
+def _pad(f):
+    remainder = f.tell() % 8
+    if remainder:
+        f.write(b"\x00" * (8 - remainder))
+
+
+def save_binary(bin_path, store, index, source_stat):
+    """Serializa un almacén compacto (sin lápidas) y su índice, construidos desde el .txt, al formato binario."""
+    if store.read_only:
+        raise ValueError("solo se pueden serializar almacenes construidos desde el .txt")
+    grams = sorted(index.postings)
+    gram_buffer = bytearray()
+    gram_offsets = array("I", [0])
+    starts = array("I", [0])
+    postings = array("I")
+    ranked_grams = array("I")
+    ranking_starts = array("I", [0])
+    rankings = array("I")
+    for i, gram in enumerate(grams):
+        gram_buffer += gram.encode("utf-8")
+        gram_offsets.append(len(gram_buffer))
+        postings.extend(index.postings[gram])
+        starts.append(len(postings))
+        ranking = index.rankings.get(gram)
+        if ranking is not None:
+            ranked_grams.append(i)
+            rankings.extend(ranking)
+            ranking_starts.append(len(rankings))
+
+    header = _HEADER.pack(
+        BINARY_MAGIC, BINARY_VERSION, _BYTEORDER,
+        source_stat.st_size, source_stat.st_mtime_ns,
+        store.id_count, len(store.buffer), len(store.table),
+        len(grams), len(gram_buffer), len(postings),
+        len(ranked_grams), len(rankings),
+    )
+    # Nombre temporal único: varios procesos, o la recarga en caliente y la
+    # compactación en el mismo proceso, pueden regenerar el binario a la vez
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(bin_path) + ".", suffix=".tmp", dir=os.path.dirname(bin_path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            for section in (store.buffer, store.offsets, store.table, store.letter_masks, store.lengths,
+                            gram_buffer, gram_offsets, starts, postings,
+                            ranked_grams, ranking_starts, rankings):
+                _pad(f)
+                f.write(section)
+        os.replace(tmp_path, bin_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_binary(bin_path, source_path):
+    """
+    Mapea en memoria un diccionario binario. Devuelve (WordStore, SubstringIndex)
+    o None si no existe, es de otra versión o el .txt de origen ha cambiado.
+    """
+    try:
+        source_stat = os.stat(source_path)
+        with open(bin_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mm) < _HEADER.size:
+        return None
+    (magic, version, byteorder, src_size, src_mtime, word_count, buffer_len,
+     table_size, gram_count, gram_buffer_len, postings_len, ranked_count, rankings_len) = _HEADER.unpack_from(mm, 0)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION or byteorder != _BYTEORDER:
+        return None
+    if src_size != source_stat.st_size or src_mtime != source_stat.st_mtime_ns:
+        return None
+
+    view = memoryview(mm)
+    position = _HEADER.size
+
+    def section(length, typecode="B"):
+        nonlocal position
+        position += -position % 8
+        start = position
+        position += length * array(typecode).itemsize
+        data = view[start:position]
+        return data if typecode == "B" else data.cast(typecode)
+
+    buffer = section(buffer_len)
+    offsets = section(word_count + 1, "I")
+    table = section(table_size, "I")
+    letter_masks = section(word_count, "Q")
+    lengths = section(word_count, "H")
+    gram_buffer = bytes(section(gram_buffer_len))
+    gram_offsets = section(gram_count + 1, "I").tolist()
+    starts = section(gram_count + 1, "I").tolist()
+    posting_view = section(postings_len, "I")
+    ranked_grams = section(ranked_count, "I").tolist()
+    ranking_starts = section(ranked_count + 1, "I").tolist()
+    ranking_view = section(rankings_len, "I")
+
+    grams = []
+    postings = {}
+    for i in range(gram_count):
+        gram = gram_buffer[gram_offsets[i]:gram_offsets[i + 1]].decode("utf-8")
+        grams.append(gram)
+        postings[gram] = posting_view[starts[i]:starts[i + 1]]
+    rankings = {
+        grams[gram_id]: ranking_view[ranking_starts[k]:ranking_starts[k + 1]]
+        for k, gram_id in enumerate(ranked_grams)
+    }
+
+    store = WordStore.from_buffers(buffer, offsets, table, letter_masks, lengths, source=mm)
+    return store, SubstringIndex.from_postings(postings, rankings, word_count)
+
+
+def load_text(txt_path, min_candidates=RANK_MIN_CANDIDATES):
+    """Carga un diccionario .txt y construye su almacén, su índice y sus tablas ordenadas."""
+    store = WordStore()
+    # Estimación de capacidad a partir del tamaño del archivo (~10 bytes por palabra)
+    store.reserve(os.path.getsize(txt_path) // 10)
+    with open(txt_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                store.add(line.lower())
+    index = SubstringIndex()
+    index.build(store.items())
+    index.build_rankings(store.lengths, store.id_count, min_candidates)
+    return store, index
+
+
+def compile_dictionary(txt_path, bin_path=None, min_candidates=RANK_MIN_CANDIDATES):
+    """Compila un diccionario .txt a su formato binario. Devuelve (almacén, índice)."""
+    bin_path = bin_path or binary_path_for(txt_path)
+    source_stat = os.stat(txt_path)
+    store, index = load_text(txt_path, min_candidates)
+    save_binary(bin_path, store, index, source_stat)
+    return store, index
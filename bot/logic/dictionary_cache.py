@@ -0,0 +1,216 @@
+import glob
+import os
+import threading
+from collections import OrderedDict
+from bot.config import DICT_CACHE_MAX_MB, DICT_DIR
+from bot.utils.logger import logger
+from bot.utils.metrics import metrics
+from bot.logic.dictionary import SubstringIndex, WordStore, binary_path_for, compile_dictionary, load_binary, load_text, save_binary
+from bot.logic.journal import apply_journal, get_journal
+
+# ========================================
+# CARGA DE DICCIONARIOS
+# ========================================
+def load_dictionary_files(dict_path):
+    """
+    Carga un diccionario desde su binario precompilado o, si está obsoleto,
+    desde el .txt (y regenera el binario). Después aplica el diario de cambios
+    pendientes de compactar. Devuelve (WordStore, SubstringIndex) o None si no
+    se pudo cargar.
+    """
+    bin_path = binary_path_for(dict_path)
+    loaded = load_binary(bin_path, dict_path)
+    if loaded:
+        logger.info(f"[LOAD] Diccionario binario mapeado: {len(loaded[0])} palabras.")
+        metrics.inc("bot_dictionary_loads_total", source="binary", file=os.path.basename(dict_path))
+        return _replay_journal(dict_path, *loaded)
+
+    try:
+        source_stat = os.stat(dict_path)
+        words, index = load_text(dict_path)
+        logger.info(f"[LOAD] Diccionario cargado: {len(words)} palabras.")
+        metrics.inc("bot_dictionary_loads_total", source="text", file=os.path.basename(dict_path))
+    except FileNotFoundError:
+        logger.error(f"[ERROR] Diccionario no encontrado: {dict_path}")
+        return None
+    except Exception as e:
+        logger.error(f"[ERROR] Error cargando diccionario: {e}")
+        return None
+
+    try:
+        save_binary(bin_path, words, index, source_stat)
+        logger.info(f"[LOAD] Binario regenerado: {os.path.basename(bin_path)}")
+    except OSError as e:
+        logger.warning(f"[LOAD] No se pudo regenerar el binario: {e}")
+
+    return _replay_journal(dict_path, words, index)
+
+def ensure_binaries():
+    """
+    Compila los binarios que falten o estén obsoletos. Se llama antes de
+    lanzar procesos trabajadores para que todos mapeen el mismo archivo en
+    lugar de reconstruir cada uno su propia copia.
+    """
+    for dict_path in sorted(glob.glob(os.path.join(DICT_DIR, "*.txt"))):
+        loaded = load_binary(binary_path_for(dict_path), dict_path)
+        if loaded is None:
+            logger.info(f"[LOAD] Compilando {os.path.basename(dict_path)}...")
+            compile_dictionary(dict_path)
+
+def _replay_journal(dict_path, words, index):
+    entries = get_journal(dict_path).replay()
+    if entries:
+        apply_journal(words, index, entries)
+        logger.info(f"[LOAD] Diario aplicado: {len(entries)} cambios pendientes de compactar.")
+    return words, index
+
+# ========================================
+# CACHÉ LRU DE DICCIONARIOS
+# ========================================
+class DictionaryCache:
+    """
+    Caché LRU de diccionarios cargados, indexada por idioma y limitada por
+    memoria. Un hilo en segundo plano puede precargar idiomas al arrancar.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.loading = {}
+        self.lock = threading.Lock()
+
+    def get(self, language, dict_path):
+        """Devuelve (WordStore, SubstringIndex) del idioma, cargándolo si hace falta."""
+        with self.lock:
+            entry = self.entries.get(language)
+            if entry is not None:
+                self.entries.move_to_end(language)
+                return entry
+            event = self.loading.get(language)
+            owner = event is None
+            if owner:
+                event = self.loading[language] = threading.Event()
+
+        if not owner:
+            # Otro hilo (p. ej. la precarga) ya lo está cargando: esperar a que termine
+            event.wait()
+            with self.lock:
+                entry = self.entries.get(language)
+            if entry is not None:
+                return entry
+            return self.get(language, dict_path)
+
+        try:
+            entry = load_dictionary_files(dict_path)
+            if entry is None:
+                # Los fallos no se cachean: el archivo puede aparecer más tarde
+                return WordStore(), SubstringIndex()
+            with self.lock:
+                self.entries[language] = entry
+                self._evict(keep=language)
+            return entry
+        finally:
+            with self.lock:
+                del self.loading[language]
+            event.set()
+
+    def _evict(self, keep):
+        total = sum(self._entry_bytes(entry) for entry in self.entries.values())
+        for language in list(self.entries):
+            if total <= self.max_bytes:
+                break
+            if language == keep:
+                continue
+            total -= self._entry_bytes(self.entries.pop(language))
+            logger.info(f"[CACHE] Diccionario '{language}' expulsado de la caché")
+
+    @staticmethod
+    def _entry_bytes(entry):
+        words, index = entry
+        return words.nbytes + index.nbytes
+
+    def invalidate(self, language):
+        with self.lock:
+            self.entries.pop(language, None)
+
+    def peek(self, language):
+        """Entrada cargada del idioma, sin cargarla ni tocar el orden LRU (None si no está)."""
+        with self.lock:
+            return self.entries.get(language)
+
+    def reload(self, language, dict_path):
+        """
+        Reconstruye desde disco el diccionario de un idioma ya cargado y
+        publica la versión nueva de una vez (copy-on-write): la anterior no se
+        modifica y quien la esté usando termina con ella. Devuelve la entrada
+        nueva, o None si el idioma no estaba cargado o no se pudo cargar.
+        """
+        if self.peek(language) is None:
+            return None
+        entry = load_dictionary_files(dict_path)
+        if entry is None:
+            return None
+        with self.lock:
+            if language not in self.entries:
+                # Expulsado mientras se reconstruía
+                return None
+            self.entries[language] = entry
+            self._evict(keep=language)
+        metrics.inc("bot_dictionary_reloads_total", language=language)
+        return entry
+
+    def preload(self, languages):
+        """Precarga una lista de (idioma, ruta) en un hilo en segundo plano."""
+        if not languages:
+            return None
+
+        def run():
+            for language, dict_path in languages:
+                self.get(language, dict_path)
+            logger.info(f"[CACHE] Precarga completada: {', '.join(language for language, _ in languages)}")
+
+        thread = threading.Thread(target=run, name="dictionary-preload", daemon=True)
+        thread.start()
+        return thread
+
+# ========================================
+# VIGILANCIA DE CAMBIOS EN DISCO
+# ========================================
+class DictionaryWatcher:
+    """
+    Detecta por sondeo (os.stat) los diccionarios modificados en disco. Un
+    cambio se da por terminado cuando el archivo no varía entre dos sondeos,
+    para no recargar un archivo a medio escribir.
+    """
+
+    def __init__(self, paths):
+        self.known = {path: self._stat(path) for path in paths}
+        self.changing = {}
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self):
+        """Devuelve los archivos cuyo cambio ya terminó desde el sondeo anterior."""
+        changed = []
+        for path, known in self.known.items():
+            current = self._stat(path)
+            if current == known:
+                self.changing.pop(path, None)
+            elif current is not None and self.changing.get(path) == current:
+                del self.changing[path]
+                self.known[path] = current
+                changed.append(path)
+            else:
+                self.changing[path] = current
+        return changed
+
+# ========================================
+# INSTANCIA GLOBAL
+# ========================================
+dictionary_cache = DictionaryCache(DICT_CACHE_MAX_MB * 1024 * 1024)
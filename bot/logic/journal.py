@@ -0,0 +1,233 @@
+import glob
+import os
+import threading
+import time
+from contextlib import contextmanager
+from bot.config import JOURNAL_FSYNC_BATCH, JOURNAL_FSYNC_INTERVAL, JOURNAL_COMPACT_THRESHOLD
+from bot.utils.logger import logger
+from bot.logic.dictionary import compile_dictionary
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+JOURNAL_SUFFIX = ".journal"
+COMPACTING_SUFFIX = ".journal.compacting"
+
+# Con varios procesos trabajadores, cada uno escribe su propio diario
+# (es.w1.journal, es.w2.journal...) y la compactación se serializa con un
+# bloqueo de archivo sobre el diccionario. Cada entrada lleva el instante en
+# que se registró para reproducir en orden las de todos los diarios.
+_worker_tag = ""
+
+def configure_worker(worker_id):
+    """Hace que los diarios de este proceso lleven la etiqueta del trabajador."""
+    global _worker_tag
+    _worker_tag = f".w{worker_id}" if worker_id else ""
+
+@contextmanager
+def dictionary_file_lock(dict_path):
+    """Bloqueo exclusivo entre procesos para reescribir un diccionario."""
+    if fcntl is None:
+        yield
+        return
+    with open(dict_path + ".lock", "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+# ========================================
+# DIARIO DE CAMBIOS DEL DICCIONARIO
+# ========================================
+class DictionaryJournal:
+    """
+    Diario append-only de palabras aprendidas (+) y baneadas (-) de un
+    diccionario. Cada operación se vuelca al sistema operativo al momento
+    (sobrevive a una caída del proceso) y el fsync se hace por lotes. El
+    diario se compacta en el .txt principal en segundo plano al superar un
+    umbral.
+
+    Al reproducir, la última operación sobre una palabra gana aunque venga de
+    otro trabajador. La compactación, en cambio, vuelca solo el diario de su
+    proceso: si dos trabajadores compactan operaciones contrarias sobre la
+    misma palabra, en el .txt queda la de la última compactación.
+    """
+
+    def __init__(self, dict_path):
+        self.dict_path = dict_path
+        self.base = os.path.splitext(dict_path)[0]
+        self.path = self.base + _worker_tag + JOURNAL_SUFFIX
+        self.compacting_path = self.base + _worker_tag + COMPACTING_SUFFIX
+        self.lock = threading.Lock()
+        self.file = None
+        self.entries = self._count_entries(self.path)
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.compaction_thread = None
+
+    @staticmethod
+    def _count_entries(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return sum(1 for line in f if line.strip())
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _read_entries(path):
+        """Operaciones (instante, op, palabra) de un diario; las entradas antiguas sin instante valen 0."""
+        entries = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if len(line) < 2 or line[0] not in "+-":
+                        continue
+                    word, _, stamp = line[1:].rstrip("\n").partition("\t")
+                    entries.append((int(stamp) if stamp.isdigit() else 0, line[0], word))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    # --- Escritura ---
+    def append(self, op, word):
+        """Registra una operación ('+' aprender, '-' banear)."""
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, "a", encoding="utf-8")
+            self.file.write(f"{op}{word}\t{time.time_ns()}\n")
+            # Al sistema operativo ya: lo que quede en el búfer se pierde si el proceso cae
+            self.file.flush()
+            self.entries += 1
+            self.unsynced += 1
+            if self.unsynced >= JOURNAL_FSYNC_BATCH or time.monotonic() - self.last_sync >= JOURNAL_FSYNC_INTERVAL:
+                self._sync_locked()
+
+    def sync(self):
+        """Fuerza la escritura a disco de las operaciones pendientes."""
+        with self.lock:
+            self._sync_locked()
+
+    def _sync_locked(self):
+        if self.file is not None and self.unsynced:
+            os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    # --- Lectura ---
+    def _journal_files(self, suffix):
+        """Diarios del diccionario de todos los procesos (el sin etiqueta primero)."""
+        return [self.base + suffix] + sorted(glob.glob(glob.escape(self.base) + ".w*" + suffix))
+
+    def replay(self):
+        """
+        Devuelve las operaciones (op, palabra) registradas por todos los
+        procesos, incluidas las de compactaciones interrumpidas, en el orden en
+        que se hicieron.
+        """
+        with self.lock:
+            entries = []
+            for path in self._journal_files(COMPACTING_SUFFIX) + self._journal_files(JOURNAL_SUFFIX):
+                entries.extend(self._read_entries(path))
+        # Orden estable: dentro de un mismo diario se respeta el orden de escritura
+        entries.sort(key=lambda entry: entry[0])
+        return [(op, word) for _, op, word in entries]
+
+    # --- Compactación ---
+    def needs_compaction(self):
+        return self.entries >= JOURNAL_COMPACT_THRESHOLD
+
+    def compact_async(self):
+        """Rota el diario y lo vuelca al .txt principal en un hilo en segundo plano."""
+        if self.compaction_thread and self.compaction_thread.is_alive():
+            return None
+
+        with self.lock:
+            self._sync_locked()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            if os.path.exists(self.path):
+                if os.path.exists(self.compacting_path):
+                    # Quedó una compactación a medias: se añade el diario actual a ella
+                    with open(self.path, "r", encoding="utf-8") as src, open(self.compacting_path, "a", encoding="utf-8") as dst:
+                        dst.write(src.read())
+                    os.remove(self.path)
+                else:
+                    os.replace(self.path, self.compacting_path)
+            self.entries = 0
+
+        self.compaction_thread = threading.Thread(target=self._compact, name="journal-compaction", daemon=True)
+        self.compaction_thread.start()
+        return self.compaction_thread
+
+    def _compact(self):
+        entries = self._read_entries(self.compacting_path)
+        if not entries:
+            return
+
+        with dictionary_file_lock(self.dict_path):
+            try:
+                try:
+                    with open(self.dict_path, "r", encoding="utf-8") as f:
+                        current_words = set(line.strip().lower() for line in f if line.strip())
+                except FileNotFoundError:
+                    current_words = set()
+
+                for _, op, word in entries:
+                    if op == "+":
+                        current_words.add(word)
+                    else:
+                        current_words.discard(word)
+
+                tmp_path = self.dict_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write("\n".join(sorted(current_words)))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.dict_path)
+                os.remove(self.compacting_path)
+                logger.info(f"[SAVE] Diario compactado en {os.path.basename(self.dict_path)} ({len(entries)} cambios)")
+            except Exception as e:
+                logger.error(f"[ERROR] Error compactando diario: {e}")
+                return
+
+            try:
+                compile_dictionary(self.dict_path)
+            except OSError as e:
+                logger.warning(f"[SAVE] No se pudo regenerar el binario: {e}")
+
+    def close(self):
+        with self.lock:
+            self._sync_locked()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def apply_journal(words, index, entries):
+    """Aplica operaciones del diario a un almacén y su índice ya cargados."""
+    for op, word in entries:
+        if op == "+":
+            indexed_ids = words.id_count
+            word_id, is_new = words.add(word)
+            if is_new and word_id >= indexed_ids:
+                index.add(word_id, word)
+        else:
+            words.remove(word)
+
+# ========================================
+# REGISTRO GLOBAL DE DIARIOS
+# ========================================
+_journals = {}
+_journals_lock = threading.Lock()
+
+def get_journal(dict_path):
+    """Devuelve el diario compartido de un diccionario."""
+    with _journals_lock:
+        journal = _journals.get(dict_path)
+        if journal is None:
+            journal = _journals[dict_path] = DictionaryJournal(dict_path)
+        return journal
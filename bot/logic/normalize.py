@@ -0,0 +1,76 @@
+import string
+import unicodedata
+
+# ========================================
+# ALFABETOS POR IDIOMA
+# ========================================
+# Letras (además de a-z) y signos que forman parte de las palabras de cada
+# diccionario. El resto de caracteres se elimina al normalizar.
+LANGUAGE_LETTERS = {
+    "Spanish": "áéíóúüñ",
+    "English": "",
+    "German": "äöüß",
+    "French": "àâæçéèêëîïôœùûüÿ'-",
+    "Italian": "àâçèéìíîòóôùú'",
+    "Brazilian Portuguese": "áâãàçéêíóôõú-",
+}
+
+# Variantes tipográficas que se sustituyen en lugar de eliminarse
+REPLACEMENTS = {
+    "’": "'",
+    "‘": "'",
+    "ʼ": "'",
+    "‐": "-",
+    "‑": "-",
+}
+
+class _Translation(dict):
+    """
+    Tabla de str.translate que decide cada carácter la primera vez que
+    aparece (se queda, se sustituye o se elimina) y guarda la decisión.
+    """
+
+    def __init__(self, allowed):
+        super().__init__()
+        self.allowed = frozenset(allowed)
+        for char, replacement in REPLACEMENTS.items():
+            if replacement in self.allowed:
+                self[ord(char)] = replacement
+
+    def __missing__(self, code):
+        value = code if chr(code) in self.allowed else None
+        self[code] = value
+        return value
+
+# ========================================
+# NORMALIZADOR DE PALABRAS
+# ========================================
+class WordNormalizer:
+    """Pasa a minúsculas y deja solo las letras del idioma, con una única llamada a str.translate."""
+
+    def __init__(self, letters):
+        self.table = _Translation(string.ascii_lowercase + letters)
+
+    def __call__(self, word):
+        """Palabra normalizada (los caracteres ajenos al idioma se eliminan)."""
+        word = word.strip().lower()
+        if not word.isascii():
+            # Acentos escritos como letra + marca combinable
+            word = unicodedata.normalize("NFC", word)
+        return word.translate(self.table)
+
+    def strict(self, word):
+        """Palabra normalizada o None si contenía caracteres ajenos al idioma (p. ej. espacios)."""
+        word = word.strip().lower()
+        if not word.isascii():
+            word = unicodedata.normalize("NFC", word)
+        normalized = word.translate(self.table)
+        return normalized if len(normalized) == len(word) else None
+
+_normalizers = {language: WordNormalizer(letters) for language, letters in LANGUAGE_LETTERS.items()}
+# Idioma aún desconocido: se aceptan las letras de todos
+_fallback = WordNormalizer("".join(sorted(set("".join(LANGUAGE_LETTERS.values())))))
+
+def get_normalizer(language_name):
+    """Normalizador del idioma (el de todos los idiomas si no está soportado o aún no se conoce)."""
+    return _normalizers.get(language_name, _fallback)
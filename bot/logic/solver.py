@@ -1,8 +1,28 @@
+import functools
+import itertools
 import os
 import random
-import re
-from bot.config import DICT_DIR, MIN_TYPING_DELAY, MAX_TYPING_DELAY, START_DELAY_MIN, START_DELAY_MAX
+import threading
+import numpy as np
+from bot.config import (
+    DICT_DIR, MIN_TYPING_DELAY, MAX_TYPING_DELAY, START_DELAY_MIN, START_DELAY_MAX, SPECULATION_DEPTH,
+    WORD_STATS, PREFER_CONFIDENT_WORDS, RANKED_TABLES,
+)
 from bot.utils.logger import logger
+from bot.utils.metrics import metrics
+from bot.logic.dictionary import LETTER_BITS, SubstringIndex, WordStore
+from bot.logic.dictionary_cache import dictionary_cache
+from bot.logic.journal import apply_journal, get_journal
+from bot.logic.normalize import get_normalizer
+from bot.logic.word_stats import TIER_CONFIDENT, TIER_DOUBTFUL, TIER_UNKNOWN, get_word_stats
+
+def _synchronized(method):
+    """Serializa el acceso al estado del solucionador y a su diccionario compartido."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock, self.words.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 # ========================================
 # SOLUCIONADOR DE PALABRAS
@@ -18,11 +38,24 @@ class WordSolver:
     }
     
     def __init__(self):
-        self.words = []
+        self.words = WordStore()
+        self.index = SubstringIndex()
         self.used_words = set()
+        self._used_flags_cache = None
+        # solve/learn/ban pueden ejecutarse en hilos del executor del servidor
+        self.lock = threading.RLock()
         self.my_peer_id = None
         self.current_language = None
         self.dict_path = None
+        self.journal = None
+        self.normalize = get_normalizer(None)
+        # Aceptaciones/rechazos por palabra del idioma actual (None si WORD_STATS está desactivado)
+        self.stats = None
+        self.prefer_confident = PREFER_CONFIDENT_WORDS
+        # Tablas precalculadas por sílaba para "longest"/"shortest" (si el diccionario las tiene)
+        self.use_rankings = RANKED_TABLES
+        # Si es False, aprender/banear solo afecta a memoria (reproducciones y simulaciones)
+        self.persist_changes = True
         
         self.is_active = True
         self.strategy = "random"
@@ -37,6 +70,12 @@ class WordSolver:
         self.banned_words_buffer = set()
         self.new_words_buffer = set()
         self.bonus_alphabet = {}
+        
+        # Respuestas precalculadas durante los turnos ajenos: (sílaba, versión, diccionario, IDs ordenados).
+        # Cualquier cambio que altere la elección incrementa la versión y la invalida.
+        self._state_version = 0
+        self._speculation = None
+        self.last_solve_speculative = False
 
     # ========================================
     # GESTIÓN DE IDENTIDAD E IDIOMA
@@ -44,19 +83,62 @@ class WordSolver:
     def set_my_id(self, peer_id):
         self.my_peer_id = peer_id
     
+    @classmethod
+    def resolve_language(cls, language_name):
+        """Devuelve (idioma, archivo) usando español si el idioma no está soportado."""
+        dict_file = cls.LANGUAGE_MAP.get(language_name)
+        if not dict_file:
+            logger.warning(f"[LANG] Idioma '{language_name}' no soportado. Usando español por defecto.")
+            return "Spanish", "es.txt"
+        return language_name, dict_file
+
+    @classmethod
+    def preload_languages(cls, language_names):
+        """Precarga en segundo plano los diccionarios de los idiomas indicados."""
+        languages = []
+        for language_name in language_names:
+            language_name, dict_file = cls.resolve_language(language_name)
+            languages.append((language_name, os.path.join(DICT_DIR, dict_file)))
+        return dictionary_cache.preload(languages)
+
+    @classmethod
+    def warm_up(cls, language_names):
+        """
+        Carga ya (de forma síncrona) los diccionarios de los idiomas indicados
+        y sus niveles de confianza, para que el primer turno no espere.
+        """
+        loaded = []
+        for language_name in language_names:
+            language_name, dict_file = cls.resolve_language(language_name)
+            dict_path = os.path.join(DICT_DIR, dict_file)
+            words, _ = dictionary_cache.get(language_name, dict_path)
+            if WORD_STATS:
+                get_word_stats(dict_path).tiers(words)
+            loaded.append(language_name)
+        return loaded
+
     def set_language(self, language_name):
         """Establece el idioma del juego y carga el diccionario correspondiente."""
+        with self.lock:
+            self._set_language(language_name)
+
+    def _set_language(self, language_name):
         if language_name == self.current_language:
             return
         
-        dict_file = self.LANGUAGE_MAP.get(language_name)
-        if not dict_file:
-            logger.warning(f"[LANG] Idioma '{language_name}' no soportado. Usando español por defecto.")
-            dict_file = "es.txt"
-            language_name = "Spanish"
+        language_name, dict_file = self.resolve_language(language_name)
+        if language_name == self.current_language:
+            return
+        
+        # Los cambios pendientes pertenecen al diccionario anterior
+        if self.dict_path:
+            self._save_dictionary()
         
         self.current_language = language_name
         self.dict_path = os.path.join(DICT_DIR, dict_file)
+        self.journal = get_journal(self.dict_path)
+        self.normalize = get_normalizer(language_name)
+        self.stats = get_word_stats(self.dict_path) if WORD_STATS else None
         
         self.banned_words_buffer.clear()
         self.new_words_buffer.clear()
@@ -65,35 +147,60 @@ class WordSolver:
         logger.info(f"[LANG] Idioma establecido: {language_name} ({dict_file})")
 
     def load_dictionary(self):
-        """Carga el diccionario desde el archivo especificado."""
+        """Obtiene el diccionario del idioma actual desde la caché (cargándolo si hace falta)."""
         if not self.dict_path:
             logger.warning("[LOAD] No se ha establecido un diccionario. Esperando setup...")
             return
         
-        try:
-            with open(self.dict_path, "r", encoding="utf-8") as f:
-                self.words = [line.strip().lower() for line in f if line.strip()]
-            logger.info(f"[LOAD] Diccionario cargado: {len(self.words)} palabras.")
-        except FileNotFoundError:
-            logger.error(f"[ERROR] Diccionario no encontrado: {self.dict_path}")
-            self.words = []
-        except Exception as e:
-            logger.error(f"[ERROR] Error cargando diccionario: {e}")
-            self.words = []
+        self.words, self.index = dictionary_cache.get(self.current_language, self.dict_path)
+        self._state_version += 1
+
+    def dictionary_outdated(self):
+        """True si la caché tiene una versión recargada del diccionario que aún no se usa."""
+        entry = dictionary_cache.peek(self.current_language) if self.current_language else None
+        return entry is not None and entry[0] is not self.words
+
+    def refresh_dictionary(self):
+        """
+        Pasa a la versión recargada del diccionario (se llama entre turnos; un
+        solve en curso termina con la anterior). Antes se le aplican los
+        cambios que la reconstrucción pudo no ver: el diario, que recoge en
+        orden lo aprendido y baneado por todas las sesiones, o, si los cambios
+        no se persisten, los búferes de esta sesión. Devuelve True si hubo cambio.
+        """
+        with self.lock:
+            entry = dictionary_cache.peek(self.current_language) if self.current_language else None
+            if entry is None or entry[0] is self.words:
+                return False
+            words, index = entry
+            with words.lock:
+                if self.persist_changes:
+                    apply_journal(words, index, self.journal.replay())
+                else:
+                    apply_journal(words, index, [("+", word) for word in self.new_words_buffer])
+                    apply_journal(words, index, [("-", word) for word in self.banned_words_buffer])
+            self.words, self.index = words, index
+            self._speculation = None
+            self._state_version += 1
+            return True
 
     # ========================================
     # GESTIÓN DE ALFABETO BONUS
     # ========================================
     def set_bonus_alphabet(self, alphabet_dict):
-        self.bonus_alphabet = alphabet_dict.copy()
-        logger.info(f"[BONUS] Alfabeto bonus actualizado: {self.bonus_alphabet}")
-        if self.strategy == "alphabet":
-            self._log_alphabet_progress()
+        with self.lock:
+            self.bonus_alphabet = alphabet_dict.copy()
+            self._state_version += 1
+            logger.info(f"[BONUS] Alfabeto bonus actualizado: {self.bonus_alphabet}")
+            if self.strategy == "alphabet":
+                self._log_alphabet_progress()
 
     def update_bonus_alphabet(self, updates_dict):
-        self.bonus_alphabet.update(updates_dict)
-        if self.strategy == "alphabet":
-            self._log_alphabet_progress()
+        with self.lock:
+            self.bonus_alphabet.update(updates_dict)
+            self._state_version += 1
+            if self.strategy == "alphabet":
+                self._log_alphabet_progress()
     
     def _log_alphabet_progress(self):
         """Muestra el progreso del alfabeto bonus."""
@@ -112,57 +219,136 @@ class WordSolver:
     # ========================================
     # GESTIÓN DE PALABRAS
     # ========================================
+    @_synchronized
     def reset_used_words(self):
         self.used_words.clear()
+        # Se vacía en el sitio: con tantas palabras como antes la caché parecería válida
+        self._used_flags_cache = None
+        self._state_version += 1
 
     def _normalize_word(self, word):
-        """Normaliza palabras eliminando caracteres no válidos."""
-        return re.sub(r'[^a-záéíóúüñ]', '', word.lower().strip())
+        """Normaliza palabras eliminando los caracteres ajenos al idioma actual."""
+        return self.normalize(word)
 
+    @_synchronized
     def mark_word_as_used(self, word):
         word = self._normalize_word(word)
-        if word: self.used_words.add(word)
+        if word and word not in self.used_words:
+            self._add_used_word(word)
+
+    def _add_used_word(self, word, word_id=None):
+        """Añade una palabra a used_words manteniendo al día la caché de IDs usados."""
+        cache = self._used_flags_cache
+        in_sync = self._used_flags_valid()
+        self.used_words.add(word)
+        self._state_version += 1
+        if not in_sync:
+            return
+        if word_id is None:
+            word_id = self.words.find(word)
+        if word_id >= 0:
+            flags = cache[3]
+            if word_id >= len(flags):
+                flags.extend(bytes(word_id + 1 - len(flags)))
+            flags[word_id] = 1
+        cache[2] = len(self.used_words)
 
+    def _used_flags_valid(self):
+        cache = self._used_flags_cache
+        return (cache is not None and cache[0] is self.words and cache[1] is self.used_words
+                and cache[2] == len(self.used_words))
+
+    def _used_flags(self):
+        """
+        Marca (1 byte por ID) de las palabras usadas en el diccionario actual.
+        Se reconstruye solo si used_words o el diccionario cambian por fuera.
+        """
+        if not self._used_flags_valid():
+            flags = bytearray(self.words.id_count)
+            for word_id in map(self.words.find, self.used_words):
+                if word_id >= 0:
+                    flags[word_id] = 1
+            self._used_flags_cache = [self.words, self.used_words, len(self.used_words), flags]
+        flags = self._used_flags_cache[3]
+        if len(flags) < self.words.id_count:
+            flags.extend(bytes(self.words.id_count - len(flags)))
+        return flags
+
+    @_synchronized
     def ban_word(self, word):
-        if word in self.words:
-            self.words.remove(word)
+        if self.words.remove(word):
+            self._state_version += 1
             self.banned_words_buffer.add(word)
+            if self.persist_changes:
+                self.journal.append("-", word)
+            metrics.inc("bot_bans_total", language=self.current_language)
             logger.warning(f"[BAN] Palabra baneada: {word}")
 
+    @_synchronized
     def learn_word(self, word):
         word = self._normalize_word(word)
         if not self.dict_path:
             return
         
-        if word and word not in self.words and word not in self.banned_words_buffer:
-            self.words.append(word)
+        if word and word not in self.banned_words_buffer:
+            indexed_ids = self.words.id_count
+            word_id, is_new = self.words.add(word)
+            if not is_new:
+                return
+            # Las palabras revividas ya estaban indexadas con su ID original
+            if word_id >= indexed_ids:
+                self.index.add(word_id, word)
+            self._state_version += 1
             self.new_words_buffer.add(word)
+            if self.persist_changes:
+                self.journal.append("+", word)
+            metrics.inc("bot_learns_total", language=self.current_language)
             logger.info(f"[LEARN] Palabra aprendida: {word}")
 
+    @_synchronized
+    def record_outcome(self, word, accepted):
+        """Anota que el juego aceptó o rechazó una palabra enviada."""
+        if self.stats is None:
+            return
+        word = self._normalize_word(word)
+        if self.stats.record(word, accepted):
+            self._state_version += 1
+
     def save_dictionary(self):
+        """Sincroniza el diario de cambios y lanza la compactación si supera el umbral."""
+        with self.lock:
+            self._save_dictionary()
+
+    def _save_dictionary(self):
         if not self.dict_path:
             logger.warning("[SAVE] No se puede guardar: diccionario no establecido.")
             return
         
+        if self.stats is not None and self.persist_changes:
+            saved = self.stats.save()
+            if saved:
+                logger.info(f"[STATS] Estadísticas guardadas ({saved} palabras).")
+        
         if not self.banned_words_buffer and not self.new_words_buffer: 
             return
+        
+        if not self.persist_changes:
+            self.banned_words_buffer.clear()
+            self.new_words_buffer.clear()
+            return
 
         logger.info(f"[SAVE] Guardando diccionario ({self.current_language})... (+{len(self.new_words_buffer)}, -{len(self.banned_words_buffer)})")
         
         try:
-            with open(self.dict_path, "r", encoding="utf-8") as f:
-                current_words = set(line.strip().lower() for line in f if line.strip())
-            
-            current_words -= self.banned_words_buffer
-            current_words.update(self.new_words_buffer)
-            
-            with open(self.dict_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(sorted(current_words)))
-            
-            logger.info("[SAVE] Diccionario guardado.")
+            self.journal.sync()
+            logger.info("[SAVE] Diario sincronizado.")
             self.banned_words_buffer.clear()
             self.new_words_buffer.clear()
             
+            if self.journal.needs_compaction():
+                logger.info("[SAVE] Compactando diario en segundo plano...")
+                self.journal.compact_async()
+            
         except Exception as e:
             logger.error(f"[ERROR] Error guardando diccionario: {e}")
 
@@ -170,52 +356,272 @@ class WordSolver:
     # CONFIGURACIÓN
     # ========================================
     def update_config(self, config):
-        if "active" in config: self.is_active = config["active"]
-        if "autojoin" in config: self.autojoin = config["autojoin"]
-        if "suicide" in config: self.suicide = config["suicide"]
-
-        if config.get("strategy_alphabet"):
-            self.strategy = "alphabet"
-            self._log_alphabet_progress()
-        elif config.get("strategy_longest"): self.strategy = "longest"
-        elif config.get("strategy_shortest"): self.strategy = "shortest"
-        elif any(k in config for k in ["strategy_alphabet", "strategy_longest", "strategy_shortest"]):
-            self.strategy = "random"
-
-        if "minTypingDelay" in config: self.min_typing_delay = float(config["minTypingDelay"])
-        if "maxTypingDelay" in config: self.max_typing_delay = float(config["maxTypingDelay"])
-        if "startDelayMin" in config: self.start_delay_min = float(config["startDelayMin"])
-        if "startDelayMax" in config: self.start_delay_max = float(config["startDelayMax"])
+        with self.lock:
+            self._state_version += 1
+            if "active" in config: self.is_active = config["active"]
+            if "autojoin" in config: self.autojoin = config["autojoin"]
+            if "suicide" in config: self.suicide = config["suicide"]
+
+            if config.get("strategy_alphabet"):
+                self.strategy = "alphabet"
+                self._log_alphabet_progress()
+            elif config.get("strategy_longest"): self.strategy = "longest"
+            elif config.get("strategy_shortest"): self.strategy = "shortest"
+            elif any(k in config for k in ["strategy_alphabet", "strategy_longest", "strategy_shortest"]):
+                self.strategy = "random"
+
+            if "minTypingDelay" in config: self.min_typing_delay = float(config["minTypingDelay"])
+            if "maxTypingDelay" in config: self.max_typing_delay = float(config["maxTypingDelay"])
+            if "startDelayMin" in config: self.start_delay_min = float(config["startDelayMin"])
+            if "startDelayMax" in config: self.start_delay_max = float(config["startDelayMax"])
+
+    # ========================================
+    # INSTANTÁNEAS DE ESTADO
+    # ========================================
+    # Atributos de configuración que se conservan entre reinicios
+    SNAPSHOT_CONFIG = (
+        "is_active", "strategy", "autojoin", "suicide",
+        "min_typing_delay", "max_typing_delay", "start_delay_min", "start_delay_max",
+    )
+
+    def snapshot_state(self):
+        """Estado de la partida y configuración en tiempo de ejecución (serializable a JSON)."""
+        with self.lock:
+            return {
+                "language": self.current_language,
+                "used_words": sorted(self.used_words),
+                "bonus_alphabet": dict(self.bonus_alphabet),
+                "config": {name: getattr(self, name) for name in self.SNAPSHOT_CONFIG},
+            }
+
+    @_synchronized
+    def restore_state(self, state):
+        """Recupera el estado de snapshot_state (el idioma ya debe estar establecido)."""
+        self.used_words = set(state.get("used_words") or ())
+        self._used_flags_cache = None
+        self.bonus_alphabet = dict(state.get("bonus_alphabet") or {})
+        config = state.get("config") or {}
+        for name in self.SNAPSHOT_CONFIG:
+            if name in config:
+                setattr(self, name, config[name])
+        self._state_version += 1
 
     # ========================================
     # ALGORITMO DE RESOLUCIÓN
     # ========================================
-    def solve(self, syllable):
-        syllable = syllable.lower()
-        
-        candidates = [w for w in self.words if syllable in w and w not in self.used_words]
+    def _candidate_ids(self, syllable):
+        """IDs vivos que contienen la sílaba, tomados de su lista en el índice."""
+        words = self.words
+        ids = np.frombuffer(self.index.lookup(syllable), dtype=np.uint32)
+        if not ids.size:
+            return ids
         
-        if self.strategy == "random" and len(candidates) > 50:
-            candidates = candidates[:50]
+        ids = ids[np.frombuffer(words.alive, dtype=np.uint8)[ids] == 1]
+        if len(syllable) > SubstringIndex.MAX_GRAM:
+            # El índice solo cubre hasta MAX_GRAM caracteres: verificar la sílaba completa
+            ids = ids[np.fromiter((syllable in words.word(i) for i in ids.tolist()), dtype=bool, count=ids.size)]
+        return ids
+
+    def _pending_alphabet_mask(self):
+        mask = 0
+        for letter, count in self.bonus_alphabet.items():
+            if count > 0:
+                mask |= LETTER_BITS.get(letter, 0)
+        return mask
 
-        if not candidates:
-            return next((w for w in self.words if syllable in w), None)
+    def _rank(self, syllable, depth):
+        """
+        Devuelve (IDs de las mejores respuestas, de mejor a peor, según la
+        estrategia; ID de reserva si todas las coincidencias están usadas).
+        """
+        words = self.words
+        tiers = None
+        if self.prefer_confident and self.stats is not None:
+            tiers = self.stats.tiers(words)
+
+        if self.use_rankings and self.strategy in ("longest", "shortest"):
+            ranked = self._rank_from_table(syllable, depth, tiers)
+            if ranked:
+                return ranked, None
+
+        matches = self._candidate_ids(syllable)
+        if not matches.size:
+            return [], None
+        
+        used = np.frombuffer(self._used_flags(), dtype=np.uint8)
+        candidates = matches[used[matches] == 0]
+        del used
+        
+        if not candidates.size:
+            return [], int(matches[0])
 
         if self.strategy == "longest":
-            choice = max(candidates, key=len)
+            scores = words.lengths_of(candidates).astype(np.int64)
         elif self.strategy == "shortest":
-            choice = min(candidates, key=len)
+            scores = -words.lengths_of(candidates).astype(np.int64)
         elif self.strategy == "alphabet":
-            def score(w):
-                return (sum(1 for c in set(w) if self.bonus_alphabet.get(c, 0) > 0), len(w))
-            choice = max(candidates, key=score)
-            
-            needed = score(choice)[0]
-            if needed > 0:
-                bonus_letters = [c for c in set(choice) if self.bonus_alphabet.get(c, 0) > 0]
-                logger.info(f"[LIVES] Vidas: '{choice}' (+{needed}) → Letras: {', '.join(sorted(bonus_letters))}")
+            pending = np.uint64(self._pending_alphabet_mask())
+            masks = words.masks_of(candidates)
+            needed_counts = _popcount(masks & pending).astype(np.int64)
+            lengths = words.lengths_of(candidates)
+            # Misma prioridad que antes: letras pendientes y, a igualdad, longitud
+            scores = needed_counts * 0x10000 + lengths
         else:
-            choice = random.choice(candidates)
+            if tiers is None:
+                pool = candidates[:50].tolist()
+                return random.sample(pool, min(depth, len(pool))), None
+            # Al azar, pero primero las palabras ya aceptadas y al final las dudosas
+            candidates = candidates[np.argsort(-tiers[candidates], kind="stable")]
+            pool = candidates[:50].tolist()
+            random.shuffle(pool)
+            pool.sort(key=lambda word_id: -tiers[word_id])
+            return pool[:depth], None
+
+        if tiers is not None:
+            # La confianza manda; la estrategia decide dentro de cada nivel
+            scores = scores + tiers[candidates].astype(np.int64) * (1 << 40)
+
+        if depth == 1:
+            return [int(candidates[scores.argmax()])], None
+        # Orden estable: a igualdad de puntuación gana el primero, como con argmax
+        return candidates[np.argsort(-scores, kind="stable")[:depth]].tolist(), None
+
+    def _rank_from_table(self, syllable, depth, tiers):
+        """
+        Mejores respuestas "longest"/"shortest" recorriendo la tabla
+        precalculada de la sílaba: se para en cuanto tiene `depth` IDs libres.
+        Las palabras con historial (pocas) se separan antes con una sola
+        pasada vectorizada. Devuelve [] si la sílaba no tiene tabla o
+        respuestas libres (el llamante usa entonces el camino general).
+        """
+        table = self.index.ranking(syllable)
+        if table is None:
+            return []
+        
+        words = self.words
+        alive, length = words.alive, words.length
+        used = self._used_flags()
+        sign = -1 if self.strategy == "longest" else 1
+        # Las tablas solo tienen IDs del binario: sus longitudes están en words.lengths
+        order = _longest_first(table, words.lengths) if sign < 0 else table
+
+        def key(word_id):
+            return sign * length(word_id), word_id
+
+        def free(word_id):
+            return alive[word_id] and not used[word_id]
+
+        if tiers is None:
+            ranked = _take(filter(free, order), depth)
+        else:
+            ids = np.frombuffer(table, dtype=np.uint32)
+            special = ids[tiers[ids] != TIER_UNKNOWN].tolist()
+            confident = sorted((i for i in special if tiers[i] == TIER_CONFIDENT and free(i)), key=key)
+            ranked = confident[:depth]
+            if len(ranked) < depth:
+                ranked += _take((i for i in order if tiers[i] == TIER_UNKNOWN and free(i)), depth - len(ranked))
+            if len(ranked) < depth:
+                doubtful = sorted((i for i in special if tiers[i] == TIER_DOUBTFUL and free(i)), key=key)
+                ranked += doubtful[:depth - len(ranked)]
         
-        self.used_words.add(choice)
+        # Palabras aprendidas después de compilar la tabla: al final de la lista del índice
+        posting = np.frombuffer(self.index.lookup(syllable), dtype=np.uint32)
+        learned = [i for i in posting[np.searchsorted(posting, self.index.ranked_ids):].tolist() if free(i)]
+        if learned:
+            tier_of = (lambda i: -tiers[i]) if tiers is not None else (lambda i: 0)
+            ranked = sorted(ranked + learned, key=lambda i: (tier_of(i), *key(i)))[:depth]
+        return ranked
+
+    @_synchronized
+    def presolve(self, syllable):
+        """
+        Precalcula las mejores respuestas para la sílaba mientras juegan otros.
+        Devuelve cuántas quedaron preparadas (0 si la sílaba no tiene respuestas).
+        """
+        syllable = syllable.lower()
+        if not syllable:
+            return 0
+        
+        speculation = self._speculation
+        if self._speculation_valid(speculation, syllable):
+            return len(speculation[3])
+        
+        version = self._ranking_version()
+        ranked, _ = self._rank(syllable, SPECULATION_DEPTH)
+        self._speculation = (syllable, version, self.words, ranked)
+        return len(ranked)
+
+    def _ranking_version(self):
+        # Otras sesiones del mismo idioma también cambian los niveles de confianza
+        return (self._state_version, self.stats.version if self.stats is not None else 0)
+
+    def _speculation_valid(self, speculation, syllable):
+        return (speculation is not None and speculation[0] == syllable
+                and speculation[1] == self._ranking_version() and speculation[2] is self.words)
+
+    def _take_speculation(self, syllable):
+        """Primera respuesta precalculada que siga libre, o None si no sirve."""
+        speculation = self._speculation
+        if not self._speculation_valid(speculation, syllable):
+            return None
+        
+        used = self._used_flags()
+        for word_id in speculation[3]:
+            if not used[word_id] and self.words.is_alive(word_id):
+                return word_id
+        return None
+
+    @_synchronized
+    def solve(self, syllable):
+        syllable = syllable.lower()
+        if not syllable:
+            return None
+        
+        words = self.words
+        word_id = self._take_speculation(syllable)
+        self.last_solve_speculative = word_id is not None
+        if word_id is not None:
+            logger.debug(f"[SPEC] Respuesta precalculada para '{syllable}'")
+        else:
+            ranked, fallback = self._rank(syllable, 1)
+            if not ranked:
+                return words.word(fallback) if fallback is not None else None
+            word_id = ranked[0]
+        
+        choice = words.word(word_id)
+        if self.strategy == "alphabet":
+            bonus_letters = [c for c in set(choice) if self.bonus_alphabet.get(c, 0) > 0]
+            if bonus_letters:
+                logger.info(f"[LIVES] Vidas: '{choice}' (+{len(bonus_letters)}) → Letras: {', '.join(sorted(bonus_letters))}")
+        
+        self._add_used_word(choice, word_id)
         return choice
+
+
+def _longest_first(table, lengths):
+    """
+    Recorre una tabla ordenada por longitud ascendente de la palabra más
+    larga a la más corta, manteniendo el orden por ID dentro de cada longitud.
+    """
+    end = len(table)
+    while end > 0:
+        length = lengths[table[end - 1]]
+        start = end - 1
+        while start > 0 and lengths[table[start - 1]] == length:
+            start -= 1
+        yield from table[start:end]
+        end = start
+
+def _take(iterable, count):
+    """Los primeros `count` elementos de un iterable, sin consumir el resto."""
+    return list(itertools.islice(iterable, count))
+
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(values):
+        """Popcount de un array uint64 para versiones de NumPy sin bitwise_count."""
+        return _POPCOUNT_TABLE[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
@@ -0,0 +1,20 @@
+# ========================================
+# TIEMPOS DEL TURNO CON PLAZO
+# ========================================
+def fit_to_deadline(think_time, key_delays, budget):
+    """
+    Ajusta la pausa de "pensar" y las pausas entre teclas (segundos) para que
+    el turno quepa en `budget` segundos. Primero se recorta el tiempo de
+    pensar; si ni tecleando sin pausa inicial cabe, se escalan las pausas
+    entre teclas. Devuelve (think_time, key_delays, comprimido).
+    """
+    typing_time = sum(key_delays)
+    if think_time + typing_time <= budget:
+        return think_time, key_delays, False
+
+    budget = max(budget, 0.0)
+    if typing_time <= budget:
+        return budget - typing_time, key_delays, True
+
+    scale = budget / typing_time if typing_time else 0.0
+    return 0.0, [delay * scale for delay in key_delays], True
@@ -0,0 +1,193 @@
+import os
+import struct
+import threading
+import time
+import numpy as np
+from bot.config import CONFIDENT_MIN_ACCEPTS
+from bot.utils.logger import logger
+from bot.logic.journal import dictionary_file_lock
+
+STATS_SUFFIX = ".stats"
+
+# Formato: cabecera (magia, versión, nº de registros) y, por palabra,
+# longitud en bytes + UTF-8 + aceptadas, rechazadas, última vez (epoch, u32)
+MAGIC = b"JKWS"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+RECORD = struct.Struct("<III")
+
+# Niveles de confianza usados al ordenar candidatos
+TIER_DOUBTFUL = 0
+TIER_UNKNOWN = 1
+TIER_CONFIDENT = 2
+
+# ========================================
+# ESTADÍSTICAS DE PALABRAS ENVIADAS
+# ========================================
+class WordStats:
+    """
+    Veces que el juego aceptó y rechazó cada palabra de un idioma, guardadas
+    junto al diccionario (es.stats). Los cambios se acumulan en memoria y al
+    guardar se suman a lo que haya en disco, así varios procesos trabajadores
+    pueden compartir el archivo sin pisarse.
+    """
+
+    def __init__(self, dict_path):
+        self.path = os.path.splitext(dict_path)[0] + STATS_SUFFIX
+        self.lock = threading.Lock()
+        self.entries = self._read(self.path)
+        # Incrementos desde el último guardado: palabra -> [aceptadas, rechazadas, última vez]
+        self.pending = {}
+        # Cambia cuando el nivel de confianza de alguna palabra cambia
+        self.version = 0
+        self._tiers_cache = None
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return {}
+
+        entries = {}
+        try:
+            magic, version, count = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("cabecera desconocida")
+            offset = HEADER.size
+            for _ in range(count):
+                size = data[offset]
+                word = data[offset + 1:offset + 1 + size].decode("utf-8")
+                offset += 1 + size
+                entries[word] = list(RECORD.unpack_from(data, offset))
+                offset += RECORD.size
+        except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+            logger.error(f"[STATS] Estadísticas ilegibles en {path}: {e}")
+            return {}
+        return entries
+
+    @staticmethod
+    def _write(path, entries):
+        parts = [HEADER.pack(MAGIC, VERSION, len(entries))]
+        for word, (accepted, rejected, last_seen) in entries.items():
+            encoded = word.encode("utf-8")
+            parts.append(bytes((len(encoded),)) + encoded + RECORD.pack(accepted, rejected, last_seen))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def tier(entry):
+        if entry is None:
+            return TIER_UNKNOWN
+        accepted, rejected, _ = entry
+        if rejected > accepted:
+            return TIER_DOUBTFUL
+        if accepted >= CONFIDENT_MIN_ACCEPTS and accepted > rejected:
+            return TIER_CONFIDENT
+        return TIER_UNKNOWN
+
+    # --- Registro ---
+    def record(self, word, accepted):
+        """Anota un resultado. Devuelve True si cambió el nivel de confianza de la palabra."""
+        if not word or len(word.encode("utf-8")) > 255:
+            return False
+        now = int(time.time())
+        with self.lock:
+            entry = self.entries.get(word)
+            old_tier = self.tier(entry)
+            if entry is None:
+                entry = self.entries[word] = [0, 0, 0]
+            delta = self.pending.setdefault(word, [0, 0, 0])
+            slot = 0 if accepted else 1
+            entry[slot] += 1
+            delta[slot] += 1
+            entry[2] = delta[2] = now
+            new_tier = self.tier(entry)
+            if new_tier == old_tier:
+                return False
+            self.version += 1
+            cache = self._tiers_cache
+            if cache is not None:
+                # Actualizar en el sitio en vez de reconstruir todo el array
+                word_id = cache[0].find(word)
+                if 0 <= word_id < len(cache[2]):
+                    cache[2][word_id] = new_tier
+                cache[1] = self.version
+            return True
+
+    def get(self, word):
+        """(aceptadas, rechazadas, última vez) de una palabra, o None si nunca se envió."""
+        with self.lock:
+            entry = self.entries.get(word)
+            return tuple(entry) if entry else None
+
+    # --- Consulta para el solucionador ---
+    def tiers(self, store):
+        """
+        Nivel de confianza por ID de `store` (int8, TIER_UNKNOWN para las
+        palabras sin historial). Se reconstruye solo si cambian los niveles
+        o el diccionario.
+        """
+        with self.lock:
+            cache = self._tiers_cache
+            if (cache is not None and cache[0] is store and cache[1] == self.version
+                    and len(cache[2]) >= store.id_count):
+                return cache[2]
+
+            tiers = np.full(store.id_count, TIER_UNKNOWN, dtype=np.int8)
+            for word, entry in self.entries.items():
+                tier = self.tier(entry)
+                if tier != TIER_UNKNOWN:
+                    word_id = store.find(word)
+                    if word_id >= 0:
+                        tiers[word_id] = tier
+            self._tiers_cache = [store, self.version, tiers]
+            return tiers
+
+    # --- Persistencia ---
+    def save(self):
+        """Suma los resultados pendientes a los del archivo y lo reescribe de forma atómica."""
+        with self.lock:
+            if not self.pending:
+                return 0
+            pending, self.pending = self.pending, {}
+
+        try:
+            with dictionary_file_lock(self.path):
+                merged = self._read(self.path)
+                _merge(merged, pending)
+                self._write(self.path, merged)
+        except OSError as e:
+            logger.error(f"[STATS] Error guardando {self.path}: {e}")
+            with self.lock:
+                _merge(self.pending, pending)
+            return 0
+
+        with self.lock:
+            # Lo registrado mientras se escribía sigue pendiente
+            _merge(merged, self.pending)
+            self.entries = merged
+            self.version += 1
+        return len(pending)
+
+def _merge(target, deltas):
+    """Suma los contadores de `deltas` a `target` y se queda con la fecha más reciente."""
+    for word, (accepted, rejected, last_seen) in deltas.items():
+        entry = target.setdefault(word, [0, 0, 0])
+        entry[0] += accepted
+        entry[1] += rejected
+        entry[2] = max(entry[2], last_seen)
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+def get_word_stats(dict_path):
+    """Devuelve las estadísticas compartidas del diccionario."""
+    with _stats_lock:
+        stats = _stats.get(dict_path)
+        if stats is None:
+            stats = _stats[dict_path] = WordStats(dict_path)
+        return stats
@@ -0,0 +1,40 @@
+import json
+import logging
+import time
+from bot.utils.logger import packet_logger
+
+# ========================================
+# CAPTURA ESTRUCTURADA DE PAQUETES
+# ========================================
+# Cada línea de packets.log es un objeto JSON:
+#   {"ts": <epoch>, "conn": <id de conexión>, "dir": "recv" | "send", "msg": <texto crudo>}
+# y opcionalmente "note" con el motivo del envío.
+RECV = "recv"
+SEND = "send"
+
+def capture_packet(conn_id, direction, message, note=None):
+    """Registra un paquete en el log de tráfico en formato JSON por línea."""
+    if not packet_logger.isEnabledFor(logging.DEBUG):
+        return
+    if isinstance(message, bytes):
+        # Frames binarios: el JSON de la captura solo admite texto
+        message = message.decode("utf-8", errors="replace")
+    record = {"ts": time.time(), "conn": conn_id, "dir": direction, "msg": message}
+    if note:
+        record["note"] = note
+    # El JSON se genera en el hilo escritor del log (PacketFormatter)
+    packet_logger.debug(record)
+
+def read_capture(path):
+    """Itera los registros de una captura, ignorando líneas que no sean JSON (formato antiguo)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line.startswith("{"):
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and "msg" in record and "dir" in record:
+                yield record
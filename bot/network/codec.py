@@ -0,0 +1,270 @@
+import json
+import re
+from bot.utils.logger import logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ========================================
+# BACKEND JSON
+# ========================================
+# orjson si está instalado (varias veces más rápido), si no la librería estándar
+if orjson is not None:
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj):
+        return orjson.dumps(obj).decode("utf-8")
+else:
+    JSONDecodeError = json.JSONDecodeError
+
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj):
+        return json.dumps(obj)
+
+# ========================================
+# EVENTOS TIPADOS
+# ========================================
+# El userscript reenvía los eventos del juego tal cual: unos llegan como lista
+# posicional y otros como objeto. Cada clase normaliza su evento a una única
+# forma para que los manejadores no tengan que distinguirlas.
+def _rule_values(rules):
+    """Reglas de la sala como {nombre: valor}; el juego las envía como {nombre: {"value": valor}}."""
+    if not isinstance(rules, dict):
+        return {}
+    return {name: rule.get("value") if isinstance(rule, dict) else rule for name, rule in rules.items()}
+
+class Setup:
+    __slots__ = ("self_peer_id", "language", "rules")
+
+    def __init__(self, self_peer_id, language, rules):
+        self.self_peer_id = self_peer_id
+        # None si el manifiesto no se pudo interpretar
+        self.language = language
+        self.rules = rules
+
+    @classmethod
+    def from_payload(cls, payload):
+        try:
+            manifest = payload.get("milestone", {}).get("dictionaryManifest", {})
+            language = manifest.get("name", "Spanish")
+        except AttributeError:
+            language = None
+        return cls(payload.get("selfPeerId"), language, _rule_values(payload.get("rules")))
+
+class Rules:
+    __slots__ = ("rules",)
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    @classmethod
+    def from_payload(cls, payload):
+        if isinstance(payload, list) and len(payload) > 0:
+            payload = payload[0]
+        rules = _rule_values(payload)
+        return cls(rules) if rules else None
+
+class NextTurn:
+    __slots__ = ("player_id", "syllable")
+
+    def __init__(self, player_id, syllable):
+        self.player_id = player_id
+        self.syllable = syllable
+
+    @classmethod
+    def from_payload(cls, payload):
+        if isinstance(payload, list):
+            return cls(payload[0], payload[1])
+        return cls(payload.get("playerPeerId"), payload.get("syllable"))
+
+class FailWord:
+    __slots__ = ("player_id", "reason")
+
+    def __init__(self, player_id, reason):
+        self.player_id = player_id
+        self.reason = reason
+
+    @classmethod
+    def from_payload(cls, payload):
+        if isinstance(payload, list):
+            return cls(payload[0], payload[1])
+        return cls(payload.get("playerPeerId"), payload.get("reason"))
+
+class CorrectWord:
+    __slots__ = ("player_id", "bonus_letters")
+
+    def __init__(self, player_id, bonus_letters):
+        self.player_id = player_id
+        self.bonus_letters = bonus_letters
+
+    @classmethod
+    def from_payload(cls, payload):
+        if isinstance(payload, list):
+            payload = payload[0]
+        return cls(payload.get("playerPeerId"), payload.get("bonusLetters"))
+
+class PlayerWord:
+    __slots__ = ("player_id", "word")
+
+    def __init__(self, player_id, word):
+        self.player_id = player_id
+        self.word = word
+
+    @classmethod
+    def from_payload(cls, payload):
+        if isinstance(payload, list) and len(payload) >= 2:
+            return cls(payload[0], payload[1])
+        return None
+
+class Milestone:
+    __slots__ = ("name", "current_player_id", "syllable", "bonus_alphabet")
+
+    def __init__(self, name, current_player_id, syllable, bonus_alphabet):
+        self.name = name
+        self.current_player_id = current_player_id
+        self.syllable = syllable
+        self.bonus_alphabet = bonus_alphabet
+
+    @classmethod
+    def from_payload(cls, payload):
+        if isinstance(payload, list) and len(payload) > 0:
+            payload = payload[0]
+        if not isinstance(payload, dict):
+            return None
+        manifest = payload.get("dictionaryManifest") or {}
+        return cls(
+            payload.get("name"),
+            payload.get("currentPlayerPeerId"),
+            payload.get("syllable"),
+            manifest.get("bonusAlphabet"),
+        )
+
+class ConfigUpdate:
+    __slots__ = ("values",)
+
+    def __init__(self, values):
+        # Claves del panel del userscript (active, strategy_*, minTypingDelay...)
+        self.values = values
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(payload) if isinstance(payload, dict) else None
+
+class CustomMessage:
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(payload) if payload else None
+
+class ClientHello:
+    __slots__ = ("typing_plans", "tab_id")
+
+    def __init__(self, typing_plans, tab_id=None):
+        self.typing_plans = typing_plans
+        self.tab_id = tab_id
+
+    @classmethod
+    def from_payload(cls, payload):
+        if not isinstance(payload, dict):
+            return None
+        tab_id = payload.get("tabId")
+        return cls(bool(payload.get("typingPlans")), tab_id if isinstance(tab_id, str) and tab_id else None)
+
+class TypingPlanDone:
+    __slots__ = ("plan_id", "cancelled")
+
+    def __init__(self, plan_id, cancelled):
+        self.plan_id = plan_id
+        self.cancelled = cancelled
+
+    @classmethod
+    def from_payload(cls, payload):
+        if not isinstance(payload, dict):
+            return None
+        return cls(payload.get("id"), bool(payload.get("cancelled")))
+
+class ProbeReply:
+    __slots__ = ("probe_id",)
+
+    def __init__(self, probe_id):
+        self.probe_id = probe_id
+
+    @classmethod
+    def from_payload(cls, payload):
+        if not isinstance(payload, dict):
+            return None
+        return cls(payload.get("id"))
+
+EVENT_TYPES = {
+    "setup": Setup,
+    "nextTurn": NextTurn,
+    "failWord": FailWord,
+    "correctWord": CorrectWord,
+    "setPlayerWord": PlayerWord,
+    "setMilestone": Milestone,
+    "setRules": Rules,
+    "configUpdate": ConfigUpdate,
+    "customMessage": CustomMessage,
+    "clientHello": ClientHello,
+    "typingPlanDone": TypingPlanDone,
+    "probeReply": ProbeReply,
+}
+
+# ========================================
+# DECODIFICACIÓN
+# ========================================
+# El userscript serializa {event, data} con JSON.stringify, así que el nombre
+# del evento va al principio: se lee sin decodificar el resto del mensaje.
+_EVENT_PEEK = re.compile(r'\s*\{\s*"event"\s*:\s*"([^"\\]*)"')
+# Mismo patrón para los frames binarios (bytes UTF-8)
+_EVENT_PEEK_BYTES = re.compile(_EVENT_PEEK.pattern.encode("ascii"))
+
+def peek_event(message):
+    """Nombre del evento si aparece al principio del mensaje, o None si no se puede leer así."""
+    if isinstance(message, bytes):
+        match = _EVENT_PEEK_BYTES.match(message)
+        return match.group(1).decode("utf-8", errors="replace") if match else None
+    match = _EVENT_PEEK.match(message)
+    return match.group(1) if match else None
+
+def decode_event(message):
+    """
+    Devuelve (nombre, evento tipado) para los eventos que maneja el bot y
+    None para el resto. Los eventos ignorados no llegan a decodificarse.
+    """
+    event_type = peek_event(message)
+    if event_type is not None and event_type not in EVENT_TYPES:
+        return None
+
+    try:
+        data = loads(message)
+    except (JSONDecodeError, UnicodeDecodeError):
+        logger.warning("[WARN] Mensaje recibido no es un JSON válido.")
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    event_type = data.get("event")
+    event_class = EVENT_TYPES.get(event_type) if isinstance(event_type, str) else None
+    if event_class is None:
+        return None
+
+    try:
+        event = event_class.from_payload(data.get("data"))
+    except (AttributeError, IndexError, KeyError, TypeError) as e:
+        logger.warning(f"[WARN] Evento '{event_type}' con formato inesperado: {e}")
+        return None
+    if event is None:
+        return None
+    return event_type, event
@@ -0,0 +1,54 @@
+import asyncio
+import json
+from bot.utils.logger import logger
+from bot.utils.metrics import metrics
+
+# ========================================
+# ENDPOINT HTTP DE MÉTRICAS
+# ========================================
+# Servidor HTTP mínimo sobre asyncio: solo atiende GET /metrics (texto de
+# Prometheus) y GET /metrics.json, sin dependencias extra.
+async def _handle_request(reader, writer):
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), 5)
+        # Descartar las cabeceras
+        while (await asyncio.wait_for(reader.readline(), 5)) not in (b"\r\n", b"\n", b""):
+            pass
+
+        parts = request_line.decode("latin-1").split()
+        path = parts[1].split("?", 1)[0] if len(parts) >= 2 else ""
+        if len(parts) < 2 or parts[0] != "GET":
+            status, content_type, body = "405 Method Not Allowed", "text/plain", "Método no permitido\n"
+        elif path == "/metrics":
+            status, content_type, body = "200 OK", "text/plain; version=0.0.4", metrics.render_prometheus()
+        elif path == "/metrics.json":
+            status, content_type, body = "200 OK", "application/json", json.dumps(metrics.snapshot())
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", "No encontrado\n"
+
+        payload = body.encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1") + payload
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def start_metrics_server(host, port):
+    server = await asyncio.start_server(_handle_request, host, port)
+    logger.info(f"[METRICS] Métricas disponibles en http://{host}:{port}/metrics")
+    return server
+
+# ========================================
+# VOLCADO PERIÓDICO A JSON
+# ========================================
+async def dump_metrics_periodically(path, interval):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            metrics.dump_json(path)
+        except OSError as e:
+            logger.warning(f"[METRICS] No se pudo volcar las métricas: {e}")
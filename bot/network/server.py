@@ -1,20 +1,50 @@
 import asyncio
 import websockets
-import json
+import os
 import random
-from bot.config import HOST, PORT
-from bot.utils.logger import logger, packet_logger
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bot.config import (
+    HOST, PORT, PRELOAD_LANGUAGES, SOLVER_THREADS, LOOP_LAG_INTERVAL, LOOP_LAG_WARN_MS,
+    TYPING_PLANS, TYPING_PLAN_ACK_MARGIN, SPECULATIVE_SOLVE,
+    METRICS_HOST, METRICS_PORT, METRICS_DUMP_INTERVAL, METRICS_DUMP_FILE, RTT_PROBE_INTERVAL,
+    TURN_SAFETY_MARGIN, SESSION_SNAPSHOTS, SNAPSHOT_INTERVAL, SNAPSHOT_MAX_AGE, SNAPSHOT_FILE,
+    WARM_START_LANGUAGES, DICT_DIR, DICT_WATCH_INTERVAL,
+)
+from bot.utils.logger import logger
+from bot.utils.loop_monitor import LoopLagMonitor
+from bot.utils.metrics import TurnTimeline, metrics
+from bot.logic.dictionary_cache import DictionaryWatcher, dictionary_cache
 from bot.logic.solver import WordSolver
+from bot.logic.timing import fit_to_deadline
+from bot.network.capture import RECV, SEND, capture_packet
+from bot.network.codec import decode_event, dumps
+from bot.network.metrics_server import dump_metrics_periodically, start_metrics_server
+from bot.network.session import GameSession
+from bot.network.snapshot import SnapshotStore
+from bot.network.transport import configure_socket, describe_options, serve_options
 
 # ========================================
 # SERVIDOR WEBSOCKET DEL BOT
 # ========================================
 class BotServer:
-    def __init__(self):
-        self.solver = WordSolver()
-        self.current_player_words = {}
-        self.next_custom_phrase = None
-        self.pending_events = []
+    def __init__(self, persist_changes=True, worker_id=0):
+        self.sessions = {}
+        # Los IDs de conexión no se repiten entre procesos trabajadores (capturas compartidas)
+        self.next_connection_id = worker_id * 100000 + 1
+        self.persist_changes = persist_changes
+        # Factor aplicado a todas las esperas (0 = sin esperas, para reproducciones aceleradas)
+        self.time_scale = 1.0
+        # Trabajo de CPU y disco del solucionador (resolver, aprender, banear, guardar, cargar)
+        self.executor = ThreadPoolExecutor(SOLVER_THREADS, thread_name_prefix="solver") if SOLVER_THREADS > 0 else None
+        self.loop_monitor = LoopLagMonitor(LOOP_LAG_INTERVAL, LOOP_LAG_WARN_MS) if LOOP_LAG_INTERVAL > 0 else None
+        self.worker_id = worker_id
+        # Estado de las sesiones para retomarlas tras un reinicio (no en reproducciones ni simulaciones)
+        self.snapshots = SnapshotStore(self.worker_path(SNAPSHOT_FILE), SNAPSHOT_MAX_AGE) if SESSION_SNAPSHOTS and persist_changes else None
+        metrics.gauge("bot_sessions", lambda: len(self.sessions))
+        if self.loop_monitor:
+            metrics.gauge("bot_loop_lag_p99_ms", lambda: self.loop_monitor.stats()["p99_ms"])
+            metrics.gauge("bot_loop_lag_max_ms", lambda: self.loop_monitor.max_ms)
         
         self.event_handlers = {
             "setup": self.on_setup,
@@ -24,12 +54,11 @@ class BotServer:
             "setMilestone": self.on_set_milestone,
             "configUpdate": self.on_config_update,
             "customMessage": self.on_custom_message,
+            "clientHello": self.on_client_hello,
+            "typingPlanDone": self.on_typing_plan_done,
             "setPlayerWord": self.on_set_player_word,
-            "livesLost": self.on_info_event,
-            "bonusAlphabetCompleted": self.on_info_event,
-            "addPlayer": self.on_info_event,
-            "removePlayer": self.on_info_event,
-            "setRules": self.on_info_event,
+            "setRules": self.on_set_rules,
+            "probeReply": self.on_probe_reply,
         }
 
     # ========================================
@@ -37,251 +66,648 @@ class BotServer:
     # ========================================
     async def handle_connection(self, websocket):
         client_addr = websocket.remote_address
-        logger.info(f"[CONN] Cliente conectado desde: {client_addr}")
+        configure_socket(websocket)
+        session = self.open_session(websocket)
+        logger.info(f"[CONN] Cliente #{session.conn_id} conectado desde: {client_addr}")
+        if RTT_PROBE_INTERVAL > 0:
+            session.probe_task = asyncio.create_task(self._probe_rtt(session))
 
         try:
             async for message in websocket:
-                await self.process_message(websocket, message)
+                await self.process_message(session, message)
         except websockets.exceptions.ConnectionClosed:
             logger.info(f"[CONN] Cliente desconectado: {client_addr}")
         except Exception as e:
             logger.error(f"[ERROR] Error en la conexión: {e}")
-
-    async def process_message(self, websocket, message):
-        packet_logger.debug(f"[RECV] {message}")
+        finally:
+            await self.close_session(websocket)
+
+    def open_session(self, websocket):
+        """Crea la sesión de juego de una conexión con un ID estable (usado en las capturas)."""
+        conn_id = self.next_connection_id
+        self.next_connection_id += 1
+        session = GameSession(websocket, conn_id, self.persist_changes)
+        self.sessions[websocket] = session
+        return session
+
+    async def close_session(self, websocket):
+        session = self.sessions.pop(websocket, None)
+        if session:
+            self.cancel_turn(session)
+            if session.probe_task:
+                session.probe_task.cancel()
+            # Sin cliente no hay turno que precalcular: no se encolan más presolve
+            if session.speculation_task:
+                session.speculation_task.cancel()
+                session.speculation_task = None
+            session.speculation_syllable = None
+            await self.capture_snapshot(session)
+            await self.run_blocking(session.solver.save_dictionary)
+
+    def save_all(self):
+        """Guarda los cambios pendientes y la instantánea de todas las sesiones abiertas (con el loop ya parado)."""
+        for session in self.sessions.values():
+            key = self.snapshot_key(session)
+            if key is not None:
+                self.snapshots.update(key, session.solver.snapshot_state())
+            session.solver.save_dictionary()
+        if self.snapshots is not None:
+            try:
+                count = self.snapshots.save()
+                logger.info(f"[SNAPSHOT] Estado de {count} sesiones guardado.")
+            except OSError as e:
+                logger.error(f"[SNAPSHOT] No se pudo guardar la instantánea: {e}")
+
+    async def send(self, session, payload, note=None):
+        """Serializa, captura y envía un mensaje al userscript."""
+        msg = dumps(payload)
+        capture_packet(session.conn_id, SEND, msg, note)
+        await session.websocket.send(msg)
+
+    async def run_blocking(self, func, *args):
+        """Ejecuta trabajo síncrono del solucionador en el executor y espera el resultado."""
+        if self.executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def run_loading(self, func, *args):
+        """Carga diccionarios fuera del executor del solucionador: puede tardar segundos y no debe frenar los turnos."""
+        if self.executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds * self.time_scale)
+
+    async def process_message(self, session, message):
+        capture_packet(session.conn_id, RECV, message)
 
         try:
-            data = json.loads(message)
-            if not isinstance(data, dict): return
-
-            event_type = data.get("event")
-            payload = data.get("data")
-
-            if not isinstance(event_type, str): return
+            # Solo se decodifican los eventos con manejador (codec.EVENT_TYPES)
+            decoded = decode_event(message)
+            if decoded is None: return
 
-            handler = self.event_handlers.get(event_type)
-            if handler:
-                await handler(websocket, payload)
+            event_type, event = decoded
+            await self.event_handlers[event_type](session, event)
 
-        except json.JSONDecodeError:
-            logger.warning("[WARN] Mensaje recibido no es un JSON válido.")
         except Exception as e:
             logger.error(f"[ERROR] Error procesando mensaje: {e}")
 
     # ========================================
     # MANEJADORES DE EVENTOS DEL JUEGO
     # ========================================
-    async def on_setup(self, websocket, payload):
-        self.solver.set_my_id(payload.get("selfPeerId"))
-        logger.info(f"[SETUP] Setup completo. Mi ID es: {self.solver.my_peer_id}")
+    async def on_setup(self, session, event):
+        session.solver.set_my_id(event.self_peer_id)
+        logger.info(f"[SETUP] Setup completo. Mi ID es: {session.solver.my_peer_id}")
+        self.apply_rules(session, event.rules)
         
-        try:
-            milestone = payload.get("milestone", {})
-            dict_manifest = milestone.get("dictionaryManifest", {})
-            language_name = dict_manifest.get("name", "Spanish")
-            self.solver.set_language(language_name)
-        except Exception as e:
-            logger.error(f"[SETUP] Error detectando idioma: {e}. Usando español.")
-            self.solver.set_language("Spanish")
+        language_name = event.language
+        if language_name is None:
+            logger.error("[SETUP] Error detectando idioma. Usando español.")
+            language_name = "Spanish"
+        # En el executor del solucionador solo se cambia al diccionario ya cargado
+        await self.run_loading(WordSolver.warm_up, [language_name])
+        await self.run_blocking(session.solver.set_language, language_name)
+        await self.restore_snapshot(session)
         
-        await self.send_initial_config(websocket)
+        await self.send_initial_config(session)
         
-        if self.pending_events:
-            logger.info(f"[SETUP] Procesando {len(self.pending_events)} eventos pendientes...")
-            for event_type, event_payload in self.pending_events:
-                handler = self.event_handlers.get(event_type)
-                if handler:
-                    await handler(websocket, event_payload)
-            self.pending_events.clear()
-
-    async def on_next_turn(self, websocket, payload):
-        if self.solver.my_peer_id is None:
+        if session.pending_events:
+            logger.info(f"[SETUP] Procesando {len(session.pending_events)} eventos pendientes...")
+            for event_type, pending_event in session.pending_events:
+                await self.event_handlers[event_type](session, pending_event)
+            session.pending_events.clear()
+
+    async def on_next_turn(self, session, event):
+        if session.solver.my_peer_id is None:
             logger.info("[CACHE] Evento nextTurn recibido antes del setup. Guardando...")
-            self.pending_events.append(("nextTurn", payload))
+            session.pending_events.append(("nextTurn", event))
             return
         
-        if isinstance(payload, list):
-            player_id = payload[0]
-            syllable = payload[1]
-        else:
-            player_id = payload.get("playerPeerId")
-            syllable = payload.get("syllable")
-
-        is_my_turn = (player_id == self.solver.my_peer_id)
-        logger.info(f"[TURN] Turno de {player_id} (Yo: {self.solver.my_peer_id}) | Sílaba: '{syllable}'")
-
-        if is_my_turn:
-            self.last_syllable = syllable
-            if not self.solver.is_active:
-                logger.info("[PAUSE] Es mi turno, pero el bot está desactivado.")
-                return
-            await self.play_turn(websocket, syllable)
+        player_id, syllable = event.player_id, event.syllable
+        is_my_turn = (player_id == session.solver.my_peer_id)
+        logger.info(f"[TURN] Turno de {player_id} (Yo: {session.solver.my_peer_id}) | Sílaba: '{syllable}'")
+
+        if not is_my_turn:
+            self.cancel_turn(session)
+            await self.refresh_dictionary(session)
+            self.start_speculation(session, syllable)
+            return
+
+        session.last_syllable = syllable
+        self.start_turn_clock(session)
+        if not session.solver.is_active:
+            logger.info("[PAUSE] Es mi turno, pero el bot está desactivado.")
+            return
+        self.start_turn(session, syllable)
 
-    async def on_fail_word(self, websocket, payload):
-        if isinstance(payload, list):
-            player_id, reason = payload[0], payload[1]
-        else:
-            player_id, reason = payload.get("playerPeerId"), payload.get("reason")
+    async def on_fail_word(self, session, event):
+        player_id, reason = event.player_id, event.reason
 
-        if player_id == self.solver.my_peer_id:
+        if player_id == session.solver.my_peer_id:
             logger.warning(f"[FAIL] Fallé la palabra. Razón: {reason}")
+            self.record_result(session, reason or "fail")
             
-            if reason == "notInDictionary" and hasattr(self, 'last_attempted_word'):
-                bad_word = self.last_attempted_word
+            if reason == "notInDictionary" and session.last_attempted_word:
+                bad_word = session.last_attempted_word
                 logger.warning(f"[BAN] Baneando palabra inválida: {bad_word}")
-                self.solver.ban_word(bad_word)
+                await self.run_blocking(self._record_rejected_word, session.solver, bad_word)
                 
-                if hasattr(self, 'last_syllable'):
-                    if not self.solver.is_active:
+                if session.last_syllable:
+                    if not session.solver.is_active:
                         return
                     logger.info("[RETRY] Reintentando con otra palabra...")
-                    await self.play_turn(websocket, self.last_syllable)
+                    metrics.inc("bot_retries_total", language=session.solver.current_language)
+                    self.start_turn(session, session.last_syllable)
 
-    async def on_correct_word(self, websocket, payload):
-        if self.solver.my_peer_id is None:
+    async def on_correct_word(self, session, event):
+        if session.solver.my_peer_id is None:
             logger.info("[CACHE] Evento correctWord recibido antes del setup. Guardando...")
-            self.pending_events.append(("correctWord", payload))
+            session.pending_events.append(("correctWord", event))
             return
         
-        player_id = payload.get("playerPeerId")
+        player_id = event.player_id
         
-        if player_id == self.solver.my_peer_id:
-            bonus_letters = payload.get("bonusLetters")
-            if bonus_letters:
-                self.solver.update_bonus_alphabet(bonus_letters)
+        if player_id == session.solver.my_peer_id:
+            self.record_result(session, "correct")
+            if event.bonus_letters:
+                await self.run_blocking(session.solver.update_bonus_alphabet, event.bonus_letters)
 
         if player_id is not None:
-            word = self.current_player_words.get(player_id)
+            word = session.current_player_words.get(player_id)
             if word:
-                self.solver.mark_word_as_used(word)
-                self.solver.learn_word(word)
+                await self.run_blocking(self._record_correct_word, session.solver, word)
 
-    async def on_set_player_word(self, websocket, payload):
-        if isinstance(payload, list) and len(payload) >= 2:
-            self.current_player_words[payload[0]] = payload[1]
+    @staticmethod
+    def _record_correct_word(solver, word):
+        solver.mark_word_as_used(word)
+        solver.learn_word(word)
+        solver.record_outcome(word, accepted=True)
 
-    async def on_set_milestone(self, websocket, payload):
-        if isinstance(payload, list) and len(payload) > 0: payload = payload[0]
-        if not isinstance(payload, dict): return
+    @staticmethod
+    def _record_rejected_word(solver, word):
+        solver.record_outcome(word, accepted=False)
+        solver.ban_word(word)
 
-        milestone_name = payload.get("name")
+    async def on_set_player_word(self, session, event):
+        session.current_player_words[event.player_id] = event.word
+
+    async def on_set_milestone(self, session, event):
+        milestone_name = event.name
         logger.debug(f"[MILESTONE] Milestone: {milestone_name}")
 
         if milestone_name == "seating":
-            dictionary_manifest = payload.get("dictionaryManifest", {})
-            bonus_alphabet = dictionary_manifest.get("bonusAlphabet")
-            if bonus_alphabet:
-                self.solver.set_bonus_alphabet(bonus_alphabet)
+            self.cancel_turn(session)
+            if event.bonus_alphabet:
+                await self.run_blocking(session.solver.set_bonus_alphabet, event.bonus_alphabet)
 
-            self.solver.reset_used_words()
-            self.solver.save_dictionary()
+            await self.run_blocking(session.solver.reset_used_words)
+            await self.refresh_dictionary(session)
+            await self.run_blocking(session.solver.save_dictionary)
             logger.info("[RESET] Vuelta a la sala de espera. Memoria reiniciada.")
             
-            if self.solver.autojoin:
+            if session.solver.autojoin:
                 logger.info("[AUTOJOIN] Auto-unirse activado.")
-                await websocket.send(json.dumps({"action": "unirse_juego"}))
+                await self.send(session, {"action": "unirse_juego"})
 
         elif milestone_name == "round":
-            current_player = payload.get("currentPlayerPeerId")
-            syllable = payload.get("syllable")
+            current_player = event.current_player_id
+            syllable = event.syllable
             
-            if current_player == self.solver.my_peer_id:
+            if current_player != session.solver.my_peer_id:
+                self.start_speculation(session, syllable)
+            else:
                 logger.info(f"[START] ¡Empiezo yo la ronda! Sílaba: '{syllable}'")
-                self.last_syllable = syllable
+                session.last_syllable = syllable
+                self.start_turn_clock(session)
                 
-                if self.solver.is_active:
-                    await asyncio.sleep(random.uniform(0.5, 1.0))
-                    await self.play_turn(websocket, syllable)
+                if session.solver.is_active:
+                    self.start_turn(session, syllable, delay=random.uniform(0.5, 1.0))
 
-    async def on_config_update(self, websocket, payload):
-        logger.info(f"[CONFIG] Configuración recibida: {payload}")
-        self.solver.update_config(payload)
+    async def on_config_update(self, session, event):
+        config = event.values
+        logger.info(f"[CONFIG] Configuración recibida: {config}")
+        await self.run_blocking(session.solver.update_config, config)
 
-        if payload.get("autojoin") is True:
+        if config.get("autojoin") is True:
             logger.info("[AUTOJOIN] Autojoin activado manualmente.")
-            await websocket.send(json.dumps({"action": "unirse_juego"}))
+            await self.send(session, {"action": "unirse_juego"})
+
+    async def on_custom_message(self, session, event):
+        session.next_custom_phrase = event.text
+        logger.info(f"[CHAT] Frase personalizada encolada: {event.text}")
+
+    async def on_client_hello(self, session, event):
+        session.typing_plans = event.typing_plans
+        session.tab_id = event.tab_id
+        logger.info(f"[HELLO] Userscript conectado (planes de tecleo: {'sí' if session.typing_plans else 'no'})")
+
+    async def on_set_rules(self, session, event):
+        self.apply_rules(session, event.rules)
+
+    def apply_rules(self, session, rules):
+        """Toma de las reglas de la sala la duración mínima del turno (minTurnDuration)."""
+        value = rules.get("minTurnDuration")
+        if isinstance(value, (int, float)) and value > 0 and value != session.min_turn_duration:
+            session.min_turn_duration = float(value)
+            logger.info(f"[RULES] Duración mínima del turno: {session.min_turn_duration:g}s")
+
+    async def on_probe_reply(self, session, event):
+        probe = session.pending_probe
+        if probe is None or probe[0] != event.probe_id:
+            return
+        session.pending_probe = None
+        rtt = time.perf_counter() - probe[1]
+        # Media móvil para el presupuesto de tiempo del turno
+        session.rtt = rtt if not session.rtt else 0.8 * session.rtt + 0.2 * rtt
+        metrics.observe("bot_rtt_seconds", rtt, path="userscript")
+        logger.debug(f"[RTT] Ida y vuelta con el userscript: {rtt * 1000:.2f} ms")
+
+    async def on_typing_plan_done(self, session, event):
+        if not session.typing_plan: return
+        plan_id, done = session.typing_plan
+        if event.plan_id == plan_id and not done.done():
+            done.set_result(event.cancelled)
 
-    async def on_custom_message(self, websocket, payload):
-        if payload:
-            self.next_custom_phrase = payload
-            logger.info(f"[CHAT] Frase personalizada encolada: {payload}")
+    # ========================================
+    # INSTANTÁNEAS DE SESIONES
+    # ========================================
+    def snapshot_key(self, session):
+        """Clave de la instantánea de la sesión, o None si no hay nada que guardar."""
+        if self.snapshots is None or not session.solver.current_language:
+            return None
+        return session.snapshot_key()
+
+    async def capture_snapshot(self, session):
+        """Anota el estado actual de la sesión (se escribe a disco periódicamente y al apagar)."""
+        key = self.snapshot_key(session)
+        if key is not None:
+            # snapshot_state espera al cerrojo del solucionador, que puede tener un solve en curso
+            self.snapshots.update(key, await self.run_blocking(session.solver.snapshot_state))
+
+    async def restore_snapshot(self, session):
+        """Retoma el estado guardado de la sesión si vuelve tras un reinicio con el mismo idioma."""
+        key = session.snapshot_key()
+        if self.snapshots is None or key is None:
+            return
+        state = self.snapshots.take(key)
+        if state is None or state.get("language") != session.solver.current_language:
+            return
+        await self.run_blocking(session.solver.restore_state, state)
+        logger.info(f"[RESTORE] Sesión retomada: {len(session.solver.used_words)} palabras usadas, estrategia {session.solver.strategy}")
+
+    async def _snapshot_periodically(self):
+        while True:
+            await asyncio.sleep(SNAPSHOT_INTERVAL)
+            if not self.sessions and not self.snapshots.dirty:
+                continue
+            for session in list(self.sessions.values()):
+                await self.capture_snapshot(session)
+            try:
+                # Serializar en el loop (el estado cambia en él) y escribir en el executor
+                await self.run_blocking(self.snapshots.write, self.snapshots.encode())
+            except OSError as e:
+                logger.warning(f"[SNAPSHOT] No se pudo guardar la instantánea: {e}")
+
+    async def warm_start(self):
+        """Recupera las instantáneas y carga los idiomas usados más recientemente antes de escuchar."""
+        if self.snapshots is not None:
+            count = self.snapshots.load()
+            if count:
+                logger.info(f"[SNAPSHOT] {count} sesiones pendientes de retomar")
+            if SNAPSHOT_INTERVAL > 0:
+                self.snapshot_task = asyncio.create_task(self._snapshot_periodically())
+
+        languages = self.snapshots.recent_languages(WARM_START_LANGUAGES) if self.snapshots and WARM_START_LANGUAGES > 0 else []
+        if not languages:
+            return
+        start = time.perf_counter()
+        try:
+            loaded = await self.run_blocking(WordSolver.warm_up, languages)
+        except Exception as e:
+            logger.error(f"[WARM] Error cargando diccionarios: {e}")
+            return
+        logger.info(f"[WARM] Diccionarios cargados en {time.perf_counter() - start:.2f}s: {', '.join(loaded)}")
 
-    async def on_info_event(self, websocket, payload):
-        pass
+    # ========================================
+    # RECARGA EN CALIENTE DE DICCIONARIOS
+    # ========================================
+    async def _watch_dictionaries(self):
+        """Reconstruye en segundo plano los diccionarios cargados cuyo .txt cambia en disco."""
+        languages = {os.path.join(DICT_DIR, dict_file): language for language, dict_file in WordSolver.LANGUAGE_MAP.items()}
+        watcher = DictionaryWatcher(languages)
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(DICT_WATCH_INTERVAL)
+            for dict_path in watcher.poll():
+                start = time.perf_counter()
+                try:
+                    # Fuera del executor del solucionador: reconstruir puede tardar segundos
+                    entry = await loop.run_in_executor(None, dictionary_cache.reload, languages[dict_path], dict_path)
+                except Exception as e:
+                    logger.error(f"[RELOAD] Error recargando {os.path.basename(dict_path)}: {e}")
+                    continue
+                if entry is None:
+                    continue
+                logger.info(f"[RELOAD] {os.path.basename(dict_path)} recargado en {time.perf_counter() - start:.2f}s ({len(entry[0])} palabras)")
+                for session in list(self.sessions.values()):
+                    # Las sesiones a mitad de turno cambian en el siguiente turno ajeno
+                    if session.turn_task is None or session.turn_task.done():
+                        await self.refresh_dictionary(session)
+
+    async def refresh_dictionary(self, session):
+        """Pasa la sesión a la versión recargada de su diccionario, si la hay."""
+        if session.solver.dictionary_outdated() and await self.run_blocking(session.solver.refresh_dictionary):
+            logger.info(f"[RELOAD] Cliente #{session.conn_id} usa ya el diccionario nuevo ({session.solver.current_language})")
 
     # ========================================
     # SINCRONIZACIÓN DE CONFIGURACIÓN
     # ========================================
-    async def send_initial_config(self, websocket):
+    async def send_initial_config(self, session):
         """Envía la configuración inicial del servidor a Tampermonkey."""
         config = {
-            "minTypingDelay": self.solver.min_typing_delay,
-            "maxTypingDelay": self.solver.max_typing_delay,
-            "startDelayMin": self.solver.start_delay_min,
-            "startDelayMax": self.solver.start_delay_max,
-            "active": self.solver.is_active,
-            "autojoin": self.solver.autojoin,
-            "suicide": self.solver.suicide,
+            "minTypingDelay": session.solver.min_typing_delay,
+            "maxTypingDelay": session.solver.max_typing_delay,
+            "startDelayMin": session.solver.start_delay_min,
+            "startDelayMax": session.solver.start_delay_max,
+            "active": session.solver.is_active,
+            "autojoin": session.solver.autojoin,
+            "suicide": session.solver.suicide,
+            # Casillas de estrategia del panel (ninguna marcada = aleatoria)
+            "strategy_longest": session.solver.strategy == "longest",
+            "strategy_alphabet": session.solver.strategy == "alphabet",
+            "strategy_shortest": session.solver.strategy == "shortest",
         }
         
-        msg = json.dumps({"event": "initialConfig", "data": config})
-        await websocket.send(msg)
+        await self.send(session, {"event": "initialConfig", "data": config})
         logger.info(f"[CONFIG] Configuración inicial enviada a Tampermonkey")
 
+    # ========================================
+    # TAREAS DE TURNO
+    # ========================================
+    def start_turn(self, session, syllable, delay=0):
+        """
+        Juega el turno en una tarea en segundo plano para que el bucle de
+        mensajes siga atendiendo eventos mientras el bot "piensa" y teclea.
+        """
+        self.cancel_turn(session)
+        session.turn_timeline = TurnTimeline(session.solver.strategy, session.solver.current_language)
+        session.turn_task = asyncio.create_task(self._run_turn(session, syllable, delay))
+
+    def cancel_turn(self, session):
+        """Cancela el turno en curso (el turno pasó, la ronda terminó o se cerró la conexión)."""
+        task = session.turn_task
+        session.turn_task = None
+        if task and not task.done():
+            task.cancel()
+            logger.info("[TURN] Turno en curso cancelado.")
+
+    async def wait_turn(self, session):
+        """Espera a que termine el turno en curso, si lo hay."""
+        task = session.turn_task
+        if task:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def start_turn_clock(self, session):
+        """
+        Fija el plazo del turno al recibir el evento que lo abre. La bomba no
+        explota antes de minTurnDuration, así que ese es el plazo garantizado;
+        los reintentos tras un fallo conservan el del turno.
+        """
+        session.turn_deadline = time.monotonic() + session.min_turn_duration * self.time_scale
+
+    def remaining_turn_time(self, session):
+        """Segundos (sin escalar) que quedan hasta el plazo del turno, o None si no se conoce."""
+        if session.turn_deadline is None or not self.time_scale:
+            return None
+        return (session.turn_deadline - time.monotonic()) / self.time_scale
+
+    def record_result(self, session, outcome):
+        """Cierra la cronología del turno con la respuesta del juego a nuestra palabra."""
+        timeline = session.turn_timeline
+        if timeline is None or "submit" not in timeline.marks:
+            return
+        session.turn_timeline = None
+        timeline.mark("result")
+        metrics.inc("bot_turn_results_total", outcome=outcome, **timeline.labels)
+
+    def start_speculation(self, session, syllable):
+        """Precalcula en segundo plano las respuestas a la sílaba de otro jugador."""
+        if not SPECULATIVE_SOLVE or not syllable or not session.solver.is_active:
+            return
+        session.speculation_syllable = syllable
+        task = session.speculation_task
+        if task and not task.done():
+            # La tarea en curso recogerá la sílaba nueva al terminar
+            return
+        session.speculation_task = asyncio.create_task(self._run_speculation(session))
+
+    async def _run_speculation(self, session):
+        syllable = None
+        try:
+            while session.speculation_syllable != syllable:
+                syllable = session.speculation_syllable
+                count = await self.run_blocking(session.solver.presolve, syllable)
+                logger.debug(f"[SPEC] {count} respuestas precalculadas para '{syllable}'")
+        except Exception as e:
+            logger.error(f"[ERROR] Error precalculando respuestas: {e}")
+
+    async def _run_turn(self, session, syllable, delay):
+        try:
+            if delay:
+                await self.sleep(delay)
+            await self.play_turn(session, syllable)
+        except asyncio.CancelledError:
+            raise
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.error(f"[ERROR] Error jugando el turno: {e}")
+
     # ========================================
     # LÓGICA DE JUEGO
     # ========================================
-    async def play_turn(self, websocket, syllable):
-        if self.next_custom_phrase:
-            logger.info(f"[CHAT] Enviando frase personalizada: {self.next_custom_phrase}")
-            await self._type_text(websocket, self.next_custom_phrase)
-            
-            msg = json.dumps({"action": "escribir_palabra", "word": self.next_custom_phrase})
-            packet_logger.debug(f"[SEND] (Custom Phrase): {msg}")
-            await websocket.send(msg)
-            self.next_custom_phrase = None
+    async def play_turn(self, session, syllable):
+        if session.next_custom_phrase:
+            logger.info(f"[CHAT] Enviando frase personalizada: {session.next_custom_phrase}")
+            await self._type_word(session, session.next_custom_phrase, note="custom")
+            session.next_custom_phrase = None
             
-            await asyncio.sleep(0.5)
+            await self.sleep(0.5)
         
-        if self.solver.suicide:
+        if session.solver.suicide:
             logger.warning("[SUICIDE] Modo suicide activado. Enviando /suicide...")
-            await self._type_text(websocket, "/suicide")
-            
-            msg = json.dumps({"action": "escribir_palabra", "word": "/suicide"})
-            packet_logger.debug(f"[SEND] (Suicide): {msg}")
-            await websocket.send(msg)
+            await self._type_word(session, "/suicide", note="suicide")
             return
         
-        word = self.solver.solve(syllable)
+        timeline = session.turn_timeline
+        if timeline:
+            timeline.mark("solve_start")
+        solve_start = time.perf_counter()
+        word = await self.run_blocking(session.solver.solve, syllable)
+        metrics.observe(
+            "bot_solve_seconds", time.perf_counter() - solve_start,
+            strategy=session.solver.strategy, language=session.solver.current_language,
+            speculative=str(session.solver.last_solve_speculative).lower(),
+        )
+        if timeline:
+            timeline.mark("solve_end")
         if not word:
             logger.warning(f"[FAIL] No encontré ninguna palabra con '{syllable}'")
             return
 
-        self.last_attempted_word = word
+        session.last_attempted_word = word
         logger.info(f"[SOLVE] Solución encontrada: {word}")
         
-        think_time = random.uniform(self.solver.start_delay_min, self.solver.start_delay_max)
+        think_time = random.uniform(session.solver.start_delay_min, session.solver.start_delay_max)
+        key_delays = self._key_delays(session, word)
+        remaining = self.remaining_turn_time(session)
+        if remaining is not None:
+            budget = remaining - TURN_SAFETY_MARGIN - session.rtt
+            think_time, key_delays, compressed = fit_to_deadline(think_time, key_delays, budget)
+            if compressed:
+                logger.info(f"[DEADLINE] Quedan {remaining:.2f}s: tiempos comprimidos para llegar a tiempo")
+                metrics.inc("bot_turn_compressed_total", strategy=session.solver.strategy, language=session.solver.current_language)
+
         logger.info(f"[THINK] Pensando durante {think_time:.2f}s...")
-        await asyncio.sleep(think_time)
+        await self.sleep(think_time)
 
-        await self._type_text(websocket, word)
+        await self._type_word(session, word, note="submit", timeline=timeline, key_delays=key_delays)
+        self.record_deadline_margin(session)
 
-        msg = json.dumps({"action": "escribir_palabra", "word": word})
-        packet_logger.debug(f"[SEND] (Submit): {msg}")
-        await websocket.send(msg)
+    def record_deadline_margin(self, session):
+        """Registra cuánto faltaba para el plazo del turno al enviar la palabra."""
+        remaining = self.remaining_turn_time(session)
+        if remaining is None:
+            return
+        labels = {"strategy": session.solver.strategy, "language": session.solver.current_language}
+        if remaining < 0:
+            logger.warning(f"[DEADLINE] Palabra enviada {-remaining:.2f}s después del plazo del turno")
+            metrics.inc("bot_turn_deadline_misses_total", **labels)
+        metrics.observe("bot_turn_deadline_margin_seconds", max(remaining, 0.0), **labels)
+
+    @staticmethod
+    def _key_delays(session, text):
+        """Pausa (segundos) después de cada tecla, al azar entre los límites configurados."""
+        return [random.uniform(session.solver.min_typing_delay, session.solver.max_typing_delay) for _ in text]
+
+    async def _type_word(self, session, text, note=None, timeline=None, key_delays=None):
+        """Teclea y envía `text`: con un plan de tecleo si el userscript lo soporta, si no tecla a tecla."""
+        if key_delays is None:
+            key_delays = self._key_delays(session, text)
+        if TYPING_PLANS and session.typing_plans:
+            await self._run_typing_plan(session, text, key_delays, note, timeline)
+            return
+        await self._type_text(session, text, key_delays, timeline)
+        await self.send(session, {"action": "escribir_palabra", "word": text}, note=note)
+        if timeline:
+            timeline.mark("submit")
+
+    async def _run_typing_plan(self, session, text, key_delays, note=None, timeline=None):
+        """
+        Envía la palabra y las pausas entre teclas (ms) en un solo mensaje; el
+        userscript las reproduce, envía la palabra y confirma con
+        typingPlanDone. Si el turno se cancela a mitad, se avisa para que pare.
+        """
+        delays = [round(delay * 1000) for delay in key_delays]
+        session.typing_plan_id += 1
+        plan_id = session.typing_plan_id
+        done = asyncio.get_running_loop().create_future()
+        session.typing_plan = (plan_id, done)
 
-    async def _type_text(self, websocket, text):
-        """Simula tecleo letra por letra."""
+        try:
+            await self.send(session, {"action": "plan_tecleo", "id": plan_id, "word": text, "delays": delays}, note=note)
+            if timeline:
+                timeline.mark("first_key")
+            if not self.time_scale:
+                if timeline:
+                    timeline.mark("submit")
+                return
+            timeout = (sum(delays) / 1000 + TYPING_PLAN_ACK_MARGIN) * self.time_scale
+            try:
+                cancelled = await asyncio.wait_for(done, timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"[TYPE] Sin confirmación del plan de tecleo #{plan_id} tras {timeout:.1f}s")
+                return
+            if timeline and not cancelled:
+                timeline.mark("submit")
+        except asyncio.CancelledError:
+            try:
+                await self.send(session, {"action": "cancelar_tecleo", "id": plan_id})
+            except websockets.exceptions.ConnectionClosed:
+                pass
+            raise
+        finally:
+            session.typing_plan = None
+
+    async def _type_text(self, session, text, key_delays, timeline=None):
+        """Simula tecleo letra por letra (modo clásico, para userscripts sin planes de tecleo)."""
         current_text = ""
-        for char in text:
+        for char, delay in zip(text, key_delays):
             current_text += char
-            await websocket.send(json.dumps({"action": "teclear_texto", "text": current_text}))
-            await asyncio.sleep(random.uniform(self.solver.min_typing_delay, self.solver.max_typing_delay))
+            await self.send(session, {"action": "teclear_texto", "text": current_text})
+            if timeline:
+                timeline.mark("first_key")
+            await self.sleep(delay)
+
+    # ========================================
+    # SONDA DE LATENCIA
+    # ========================================
+    async def _probe_rtt(self, session):
+        """
+        Mide periódicamente la ida y vuelta hasta el JavaScript del userscript
+        (mensaje sonda → probeReply) y, aparte, la de los pings del protocolo,
+        que el navegador contesta sin pasar por el script.
+        """
+        probe_id = 0
+        try:
+            while True:
+                await asyncio.sleep(RTT_PROBE_INTERVAL)
+                probe_id += 1
+                session.pending_probe = (probe_id, time.perf_counter())
+                await self.send(session, {"action": "sonda", "id": probe_id})
+
+                ws_latency = getattr(session.websocket, "latency", 0)
+                if ws_latency:
+                    metrics.observe("bot_rtt_seconds", ws_latency, path="websocket")
+        except websockets.exceptions.ConnectionClosed:
+            pass
 
     # ========================================
     # INICIALIZACIÓN DEL SERVIDOR
     # ========================================
-    async def start(self):
+    async def start_metrics(self):
+        """Arranca el endpoint HTTP y el volcado a JSON si están configurados (uno por trabajador)."""
+        offset = max(self.worker_id - 1, 0)
+        if METRICS_PORT:
+            try:
+                self.metrics_server = await start_metrics_server(METRICS_HOST, METRICS_PORT + offset)
+            except OSError as e:
+                logger.error(f"[METRICS] No se pudo abrir el endpoint de métricas: {e}")
+        if METRICS_DUMP_INTERVAL > 0:
+            self.metrics_dump_task = asyncio.create_task(dump_metrics_periodically(self.worker_path(METRICS_DUMP_FILE), METRICS_DUMP_INTERVAL))
+
+    def worker_path(self, path):
+        """Ruta propia del proceso trabajador (metrics.json → metrics.w2.json)."""
+        if not self.worker_id:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}.w{self.worker_id}{ext}"
+
+    async def start(self, reuse_port=False):
         logger.info(f"[INIT] Iniciando servidor en ws://{HOST}:{PORT}")
-        async with websockets.serve(self.handle_connection, HOST, PORT):
+        if self.loop_monitor:
+            self.loop_monitor_task = asyncio.create_task(self.loop_monitor.run())
+        await self.start_metrics()
+        await self.warm_start()
+        if DICT_WATCH_INTERVAL > 0:
+            self.dictionary_watch_task = asyncio.create_task(self._watch_dictionaries())
+        if PRELOAD_LANGUAGES:
+            logger.info(f"[CACHE] Precargando diccionarios: {', '.join(PRELOAD_LANGUAGES)}")
+            WordSolver.preload_languages(PRELOAD_LANGUAGES)
+        logger.info(f"[NET] Transporte: {describe_options()}")
+        async with websockets.serve(self.handle_connection, HOST, PORT, reuse_port=reuse_port or None, **serve_options()):
             await asyncio.Future()
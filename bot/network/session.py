@@ -0,0 +1,51 @@
+from bot.config import DEFAULT_MIN_TURN_DURATION
+from bot.logic.solver import WordSolver
+
+# ========================================
+# SESIÓN DE JUEGO POR CONEXIÓN
+# ========================================
+class GameSession:
+    """
+    Estado mutable de una sala (una conexión del userscript). Los
+    diccionarios no se copian: cada WordSolver apunta a la entrada
+    compartida de la caché de diccionarios.
+    """
+
+    def __init__(self, websocket, conn_id, persist_changes=True):
+        self.websocket = websocket
+        self.conn_id = conn_id
+        self.solver = WordSolver()
+        self.solver.persist_changes = persist_changes
+        
+        self.current_player_words = {}
+        self.next_custom_phrase = None
+        self.pending_events = []
+        self.last_syllable = None
+        self.last_attempted_word = None
+        self.turn_task = None
+        self.speculation_task = None
+        self.speculation_syllable = None
+        # Plazo del turno: duración mínima según las reglas e instante límite (time.monotonic)
+        self.min_turn_duration = DEFAULT_MIN_TURN_DURATION
+        self.turn_deadline = None
+        # Ida y vuelta estimada con el userscript (segundos), si hay sonda
+        self.rtt = 0.0
+        # Cronología del turno en curso (métricas de latencia)
+        self.turn_timeline = None
+        # Sonda de ida y vuelta: tarea periódica y (id, instante de envío) pendiente
+        self.probe_task = None
+        self.pending_probe = None
+        # Planes de tecleo: el userscript los anuncia en clientHello
+        self.typing_plans = False
+        self.typing_plan_id = 0
+        self.typing_plan = None  # (id, futuro que resuelve la confirmación del userscript)
+        # Identificador de la pestaña (clientHello), estable entre recargas: clave de las instantáneas
+        self.tab_id = None
+
+    def snapshot_key(self):
+        """Clave con la que se guarda el estado de la sesión: la pestaña o, si no la envía, el jugador."""
+        if self.tab_id:
+            return f"tab:{self.tab_id}"
+        if self.solver.my_peer_id is not None:
+            return f"peer:{self.solver.my_peer_id}"
+        return None
@@ -0,0 +1,106 @@
+import glob
+import json
+import os
+import time
+import zlib
+from bot.utils.logger import logger
+
+SNAPSHOT_VERSION = 1
+
+# ========================================
+# INSTANTÁNEAS DE SESIONES
+# ========================================
+class SnapshotStore:
+    """
+    Estado de las sesiones (palabras usadas, alfabeto bonus, configuración)
+    guardado en un JSON comprimido con zlib para retomar las partidas tras un
+    reinicio, junto con la última vez que se usó cada idioma. Cada proceso
+    trabajador escribe su propio archivo y al arrancar se leen todos.
+    """
+
+    def __init__(self, path, max_age):
+        self.path = path
+        self.max_age = max_age
+        # clave de sesión -> estado (con "ts", instante de la captura)
+        self.entries = {}
+        # idioma -> última vez que una sesión lo usó
+        self.languages = {}
+        # Hay cambios sin escribir
+        self.dirty = False
+
+    def _files(self):
+        """Archivos de todos los trabajadores (sessions.snap, sessions.w1.snap, ...)."""
+        root, ext = os.path.splitext(self.path)
+        pattern = glob.escape(root) + "*" + ext
+        return [self.path] + [path for path in sorted(glob.glob(pattern)) if path != self.path]
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, "rb") as f:
+                payload = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            logger.error(f"[SNAPSHOT] Instantánea ilegible en {path}: {e}")
+            return None
+        if not isinstance(payload, dict) or payload.get("version") != SNAPSHOT_VERSION:
+            logger.warning(f"[SNAPSHOT] Versión de instantánea desconocida en {path}")
+            return None
+        return payload
+
+    def load(self):
+        """Lee las instantáneas y se queda con la más reciente de cada sesión. Devuelve cuántas hay."""
+        now = time.time()
+        for path in self._files():
+            payload = self._read(path)
+            if payload is None:
+                continue
+            for key, state in (payload.get("sessions") or {}).items():
+                ts = state.get("ts", 0)
+                current = self.entries.get(key)
+                if now - ts <= self.max_age and (current is None or current["ts"] < ts):
+                    self.entries[key] = state
+            for language, ts in (payload.get("languages") or {}).items():
+                self.languages[language] = max(self.languages.get(language, 0), ts)
+        return len(self.entries)
+
+    def recent_languages(self, count):
+        """Los `count` idiomas usados más recientemente, del último al más antiguo."""
+        return sorted(self.languages, key=self.languages.get, reverse=True)[:count]
+
+    def update(self, key, state):
+        state["ts"] = now = time.time()
+        self.entries[key] = state
+        self.dirty = True
+        if state.get("language"):
+            self.languages[state["language"]] = now
+
+    def take(self, key):
+        """Saca el estado guardado de una sesión (solo se restaura una vez)."""
+        state = self.entries.pop(key, None)
+        if state is not None:
+            self.dirty = True
+        if state is not None and time.time() - state.get("ts", 0) > self.max_age:
+            return None
+        return state
+
+    def encode(self):
+        """Descarta las instantáneas caducadas y serializa el resto (JSON + zlib)."""
+        now = time.time()
+        self.dirty = False
+        self.entries = {key: state for key, state in self.entries.items() if now - state["ts"] <= self.max_age}
+        payload = {"version": SNAPSHOT_VERSION, "ts": now, "languages": self.languages, "sessions": self.entries}
+        return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    def write(self, data):
+        """Escribe una instantánea serializada con encode() de forma atómica."""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def save(self):
+        """Guarda las instantáneas vigentes. Devuelve cuántas se guardaron."""
+        self.write(self.encode())
+        return len(self.entries)
@@ -0,0 +1,35 @@
+import socket
+from bot.config import (
+    WS_COMPRESSION, WS_PING_INTERVAL, WS_PING_TIMEOUT, WS_MAX_SIZE, WS_MAX_QUEUE, WS_WRITE_LIMIT, TCP_NODELAY,
+)
+from bot.utils.logger import logger
+
+# ========================================
+# AJUSTES DEL TRANSPORTE WEBSOCKET
+# ========================================
+def serve_options():
+    """Argumentos de websockets.serve según la configuración (0 = sin límite / desactivado)."""
+    return {
+        # Los mensajes son JSON de pocas decenas de bytes: comprimirlos cuesta más de lo que ahorra
+        "compression": "deflate" if WS_COMPRESSION else None,
+        "ping_interval": WS_PING_INTERVAL or None,
+        "ping_timeout": WS_PING_TIMEOUT or None,
+        "max_size": WS_MAX_SIZE or None,
+        "max_queue": WS_MAX_QUEUE or None,
+        "write_limit": WS_WRITE_LIMIT,
+    }
+
+def describe_options():
+    options = serve_options()
+    return ", ".join(f"{key}={value}" for key, value in options.items()) + f", tcp_nodelay={TCP_NODELAY}"
+
+def configure_socket(websocket):
+    """Aplica TCP_NODELAY al socket de la conexión (asyncio ya lo activa, aquí se puede desactivar)."""
+    transport = getattr(websocket, "transport", None)
+    sock = transport.get_extra_info("socket") if transport else None
+    if sock is None or sock.family not in (socket.AF_INET, socket.AF_INET6):
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if TCP_NODELAY else 0)
+    except OSError as e:
+        logger.debug(f"[NET] No se pudo ajustar TCP_NODELAY: {e}")
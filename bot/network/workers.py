@@ -0,0 +1,72 @@
+import asyncio
+import multiprocessing
+import signal
+import socket
+from bot.utils.logger import log_pipeline, logger
+from bot.logic.dictionary_cache import ensure_binaries
+from bot.logic.journal import configure_worker
+from bot.network.server import BotServer
+
+# ========================================
+# EJECUCIÓN DE UN SERVIDOR
+# ========================================
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def run_server(worker_id=0, reuse_port=False):
+    """Ejecuta un BotServer en este proceso hasta que se detenga."""
+    configure_worker(worker_id)
+    log_pipeline.use_worker_files(worker_id)
+    # SIGTERM (terminate(), systemd, docker stop) guarda el estado igual que Ctrl+C
+    signal.signal(signal.SIGTERM, _interrupt)
+    server = BotServer(worker_id=worker_id)
+    
+    try:
+        asyncio.run(server.start(reuse_port=reuse_port))
+    except KeyboardInterrupt:
+        logger.info("\n[STOP] Servidor detenido por el usuario.")
+        server.save_all()
+    except Exception as e:
+        logger.critical(f"[CRITICAL] Error fatal en el sistema: {e}")
+        server.save_all()
+    finally:
+        # Los procesos trabajadores salen sin atexit: vaciar aquí la cola del log
+        log_pipeline.stop()
+
+# ========================================
+# PROCESOS TRABAJADORES
+# ========================================
+def supports_reuse_port():
+    return hasattr(socket, "SO_REUSEPORT")
+
+def run_workers(count):
+    """
+    Lanza `count` procesos que escuchan en el mismo puerto (SO_REUSEPORT) y
+    dejan que el kernel reparta las conexiones. Los diccionarios se comparten
+    entre procesos a través de los binarios mapeados en memoria.
+    """
+    if count <= 1 or not supports_reuse_port():
+        if count > 1:
+            logger.warning("[WORKERS] SO_REUSEPORT no disponible en este sistema. Usando un solo proceso.")
+        run_server()
+        return
+
+    ensure_binaries()
+
+    logger.info(f"[WORKERS] Lanzando {count} procesos trabajadores...")
+    processes = [
+        multiprocessing.Process(target=run_server, args=(worker_id, True), name=f"bot-worker-{worker_id}")
+        for worker_id in range(1, count + 1)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info("\n[STOP] Deteniendo procesos trabajadores...")
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,214 @@
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from bot.config import BASE_DIR, DICT_DIR
+from bot.utils.logger import logger
+from bot.logic.dictionary import binary_path_for, compile_dictionary, load_binary, load_text
+from bot.logic.solver import WordSolver
+
+STRATEGIES = ["random", "longest", "shortest", "alphabet"]
+DEFAULT_FILL_LEVELS = [0.0, 0.01, 0.1, 0.5]
+
+# ========================================
+# UTILIDADES
+# ========================================
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(p / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def measure_load(loader):
+    """
+    Devuelve (resultado, segundos, pico de memoria Python en bytes). El pico
+    se mide en una segunda carga porque tracemalloc distorsiona el tiempo.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = loader()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    loader()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def sample_syllables(words, index, rng, count, min_candidates):
+    """
+    Sílabas con una distribución realista: se toma una subcadena de 2-3
+    letras de una palabra aleatoria (las sílabas frecuentes salen más),
+    descartando las que tienen menos de `min_candidates` respuestas.
+    """
+    all_words = list(words)
+    syllables = []
+    attempts = 0
+    while len(syllables) < count and attempts < count * 50:
+        attempts += 1
+        word = rng.choice(all_words)
+        n = rng.choice((2, 3))
+        if len(word) < n:
+            continue
+        i = rng.randrange(len(word) - n + 1)
+        syllable = word[i:i + n]
+        if len(index.lookup(syllable)) >= min_candidates:
+            syllables.append(syllable)
+    return syllables
+
+# ========================================
+# BENCHMARK DE UN IDIOMA
+# ========================================
+def bench_language(language, dict_file, args):
+    txt_path = os.path.join(DICT_DIR, dict_file)
+    bin_path = binary_path_for(txt_path)
+
+    (words, index), text_seconds, text_peak = measure_load(lambda: load_text(txt_path))
+    if not os.path.exists(bin_path) or load_binary(bin_path, txt_path) is None:
+        compile_dictionary(txt_path)
+    _, binary_seconds, binary_peak = measure_load(lambda: load_binary(bin_path, txt_path))
+
+    solver = WordSolver()
+    solver.current_language = language
+    solver.dict_path = txt_path
+    solver.words, solver.index = words, index
+    solver.bonus_alphabet = {letter: 1 for letter in "abcdefghijklmnopqrstuvwxyz"}
+
+    rng = random.Random(args.seed)
+    syllables = sample_syllables(words, index, rng, args.syllables, args.min_candidates)
+    all_words = list(words)
+
+    result = {
+        "language": language,
+        "file": dict_file,
+        "words": len(words),
+        "load_text_s": text_seconds,
+        "load_text_peak_bytes": text_peak,
+        "load_binary_s": binary_seconds,
+        "load_binary_peak_bytes": binary_peak,
+        "solve": [],
+    }
+
+    for fill in args.fill_levels:
+        used = set(rng.sample(all_words, int(len(all_words) * fill)))
+        for strategy in STRATEGIES:
+            solver.strategy = strategy
+            # Cada solve añade su respuesta a used_words, como en una ronda real
+            solver.used_words = set(used)
+            solver.solve(syllables[0])
+            latencies = []
+            for _ in range(args.repeat):
+                for syllable in syllables:
+                    start = time.perf_counter()
+                    solver.solve(syllable)
+                    latencies.append(time.perf_counter() - start)
+            result["solve"].append({
+                "strategy": strategy,
+                "fill": fill,
+                "samples": len(latencies),
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            })
+    return result
+
+# ========================================
+# INFORMES
+# ========================================
+def print_report(report):
+    for lang in report["languages"]:
+        print(f"\n{lang['language']} ({lang['file']}, {lang['words']} palabras)")
+        print(f"  carga .txt: {lang['load_text_s'] * 1000:.1f} ms, pico {lang['load_text_peak_bytes'] / 2**20:.1f} MB")
+        print(f"  carga .bin: {lang['load_binary_s'] * 1000:.1f} ms, pico {lang['load_binary_peak_bytes'] / 2**20:.1f} MB")
+        print(f"  {'estrategia':<10} {'llenado':>8} {'p50 ms':>9} {'p99 ms':>9}")
+        for row in lang["solve"]:
+            print(f"  {row['strategy']:<10} {row['fill']:>8.0%} {row['p50_ms']:>9.3f} {row['p99_ms']:>9.3f}")
+
+def compare_reports(base_path, new_path):
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"Base: {base.get('revision')}  Nuevo: {new.get('revision')}")
+    base_langs = {lang["language"]: lang for lang in base["languages"]}
+    for lang in new["languages"]:
+        old = base_langs.get(lang["language"])
+        if not old:
+            continue
+        print(f"\n{lang['language']}")
+        for key in ("load_text_s", "load_binary_s"):
+            print(f"  {key:<14} {old[key] * 1000:>9.1f} → {lang[key] * 1000:>9.1f} ms ({_ratio(old[key], lang[key])})")
+        old_rows = {(row["strategy"], row["fill"]): row for row in old["solve"]}
+        for row in lang["solve"]:
+            prev = old_rows.get((row["strategy"], row["fill"]))
+            if prev:
+                print(f"  {row['strategy']:<10} {row['fill']:>5.0%} p50 {prev['p50_ms']:.3f} → {row['p50_ms']:.3f} ms ({_ratio(prev['p50_ms'], row['p50_ms'])}), "
+                      f"p99 {prev['p99_ms']:.3f} → {row['p99_ms']:.3f} ms ({_ratio(prev['p99_ms'], row['p99_ms'])})")
+
+def _ratio(old, new):
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old:+.0%}"
+
+# ========================================
+# PUNTO DE ENTRADA
+# ========================================
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de WordSolver por idioma, estrategia y nivel de llenado.")
+    parser.add_argument("--languages", nargs="*", help="Idiomas a medir (por defecto, todos los diccionarios disponibles).")
+    parser.add_argument("--syllables", type=int, default=200, help="Sílabas muestreadas por idioma.")
+    parser.add_argument("--min-candidates", type=int, default=1, help="Respuestas mínimas para aceptar una sílaba.")
+    parser.add_argument("--fill-levels", type=float, nargs="*", default=DEFAULT_FILL_LEVELS, help="Fracción del diccionario marcada como usada.")
+    parser.add_argument("--repeat", type=int, default=1, help="Repeticiones de cada sílaba.")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Guarda el informe en JSON.")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NUEVO"), help="Compara dos informes JSON.")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return
+
+    logger.setLevel(logging.WARNING)
+
+    languages = [
+        (language, dict_file) for language, dict_file in WordSolver.LANGUAGE_MAP.items()
+        if os.path.exists(os.path.join(DICT_DIR, dict_file)) and (not args.languages or language in args.languages)
+    ]
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"syllables": args.syllables, "fill_levels": args.fill_levels, "repeat": args.repeat, "seed": args.seed},
+        "languages": [bench_language(language, dict_file, args) for language, dict_file in languages],
+    }
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nInforme guardado en {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from bot.config import DICT_DIR, RANK_MIN_CANDIDATES
+from bot.logic.dictionary import binary_path_for, compile_dictionary
+
+# Longitudes de las sílabas que propone el juego
+SYLLABLE_LENGTHS = (2, 3)
+
+# ========================================
+# INFORME DE COBERTURA
+# ========================================
+def coverage(store, index, max_answers):
+    """
+    Devuelve (nº de sílabas de 2-3 letras, [(sílaba, respuestas)] de las que
+    tienen como mucho `max_answers` respuestas, de menos a más).
+    """
+    syllables = [gram for gram in index.postings if len(gram) in SYLLABLE_LENGTHS and gram.isalpha()]
+    dangerous = []
+    for syllable in syllables:
+        answers = sum(1 for word_id in index.lookup(syllable) if store.is_alive(word_id))
+        if answers <= max_answers:
+            dangerous.append((syllable, answers))
+    dangerous.sort(key=lambda item: (item[1], item[0]))
+    return len(syllables), dangerous
+
+def print_report(store, index, max_answers, limit):
+    total, dangerous = coverage(store, index, max_answers)
+    entries = sum(len(ranking) for ranking in index.rankings.values())
+    print(f"  Tablas ordenadas: {len(index.rankings)} sílabas, {entries} entradas ({entries * 4 / (1024 * 1024):.1f} MB)")
+    print(f"  Sílabas peligrosas (≤ {max_answers} respuestas): {len(dangerous)} de {total}")
+    for syllable, answers in dangerous[:limit]:
+        print(f"    {syllable:<5} {answers}")
+    if len(dangerous) > limit:
+        print(f"    ... y {len(dangerous) - limit} más")
+
+# ========================================
+# COMPILADOR DE DICCIONARIOS BINARIOS
+# ========================================
+def main():
+    parser = argparse.ArgumentParser(description="Compila data/diccionarios/*.txt al formato binario mapeable.")
+    parser.add_argument("files", nargs="*", help="Diccionarios .txt a compilar (por defecto, todos).")
+    parser.add_argument("--min-candidates", type=int, default=RANK_MIN_CANDIDATES,
+                        help="Respuestas mínimas para precalcular la tabla ordenada de una sílaba (0 = ninguna).")
+    parser.add_argument("--report", action="store_true", help="Muestra la cobertura de sílabas de cada diccionario.")
+    parser.add_argument("--max-answers", type=int, default=5, help="Respuestas a partir de las que una sílaba deja de ser peligrosa.")
+    parser.add_argument("--limit", type=int, default=30, help="Sílabas peligrosas listadas por diccionario.")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(DICT_DIR, "*.txt")))
+    for txt_path in files:
+        start = time.perf_counter()
+        store, index = compile_dictionary(txt_path, min_candidates=args.min_candidates)
+        elapsed = time.perf_counter() - start
+        bin_path = binary_path_for(txt_path)
+        size_mb = os.path.getsize(bin_path) / (1024 * 1024)
+        print(f"{os.path.basename(txt_path)} → {os.path.basename(bin_path)}: {len(store)} palabras, {size_mb:.1f} MB en {elapsed:.2f}s")
+        if args.report:
+            print_report(store, index, args.max_answers, args.limit)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import heapq
+import io
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from bot.config import DICT_DIR
+from bot.logic.dictionary import compile_dictionary
+from bot.logic.journal import dictionary_file_lock
+from bot.logic.normalize import get_normalizer
+from bot.logic.solver import WordSolver
+
+# ========================================
+# LECTURA Y NORMALIZACIÓN
+# ========================================
+def read_words(paths, normalizer, min_length, counters):
+    """
+    Palabras normalizadas de las listas de entrada, una por línea ('-' lee
+    de la entrada estándar). Se descartan las que tienen caracteres ajenos
+    al idioma (p. ej. expresiones de varias palabras) o son demasiado cortas.
+    """
+    for path in paths:
+        if path == "-":
+            f = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", errors="replace")
+        else:
+            f = open(path, "r", encoding="utf-8", errors="replace")
+        with f:
+            for line in f:
+                if not line.strip():
+                    continue
+                counters["read"] += 1
+                word = normalizer.strict(line)
+                if word is None or len(word) < min_length:
+                    counters["rejected"] += 1
+                    continue
+                yield word
+
+def read_existing(path):
+    """Entradas del diccionario actual tal cual, sin filtrar: mezclar no debe borrar ninguna."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            word = line.rstrip("\n")
+            if word:
+                yield word
+
+# ========================================
+# ORDENACIÓN EXTERNA
+# ========================================
+def write_runs(words, chunk_size, tmp_dir):
+    """Ordena y deduplica la entrada por bloques de `chunk_size` palabras; cada bloque va a un archivo."""
+    runs = []
+    while True:
+        chunk = set(itertools.islice(words, chunk_size))
+        if not chunk:
+            return runs
+        fd, path = tempfile.mkstemp(prefix="run-", suffix=".txt", dir=tmp_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for word in sorted(chunk):
+                f.write(word + "\n")
+        runs.append(path)
+
+def read_run(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+def merge_runs(runs, output_path):
+    """Mezcla los bloques ordenados sin repetir palabras. Devuelve cuántas se escribieron."""
+    count = 0
+    previous = None
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for word in heapq.merge(*(read_run(path) for path in runs)):
+            if word == previous:
+                continue
+            # Mismo formato que la compactación del diario: sin salto de línea final
+            f.write(word if previous is None else "\n" + word)
+            previous = word
+            count += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, output_path)
+    return count
+
+# ========================================
+# PUNTO DE ENTRADA
+# ========================================
+def main():
+    parser = argparse.ArgumentParser(description="Normaliza, deduplica e incorpora listas de palabras a data/diccionarios/ con memoria acotada.")
+    parser.add_argument("inputs", nargs="+", help="Listas de palabras (una por línea, '-' para la entrada estándar).")
+    parser.add_argument("--language", required=True, choices=sorted(WordSolver.LANGUAGE_MAP), help="Idioma del diccionario de destino.")
+    parser.add_argument("--replace", action="store_true", help="Sustituye el diccionario en vez de mezclarlo con el existente.")
+    parser.add_argument("--min-length", type=int, default=1, help="Longitud mínima de las palabras.")
+    parser.add_argument("--chunk-size", type=int, default=500000, help="Palabras ordenadas en memoria por bloque.")
+    parser.add_argument("--tmp-dir", help="Directorio para los bloques temporales.")
+    parser.add_argument("--compile", action="store_true", help="Compila el .bin al terminar.")
+    args = parser.parse_args()
+
+    dict_path = os.path.join(DICT_DIR, WordSolver.LANGUAGE_MAP[args.language])
+    normalizer = get_normalizer(args.language)
+
+    start = time.perf_counter()
+    counters = {"read": 0, "rejected": 0}
+    with tempfile.TemporaryDirectory(prefix="ingest-", dir=args.tmp_dir) as tmp_dir:
+        runs = write_runs(read_words(args.inputs, normalizer, args.min_length, counters), args.chunk_size, tmp_dir)
+        # El diario puede estar compactando este mismo diccionario: el actual
+        # se lee y se reescribe sin soltar el cerrojo para no perder cambios
+        with dictionary_file_lock(dict_path):
+            if not args.replace and os.path.exists(dict_path):
+                runs += write_runs(read_existing(dict_path), args.chunk_size, tmp_dir)
+            count = merge_runs(runs, dict_path)
+    elapsed = time.perf_counter() - start
+
+    print(f"{os.path.basename(dict_path)}: {count} palabras ({counters['read']} leídas, "
+          f"{counters['rejected']} descartadas, {len(runs)} bloques) en {elapsed:.2f}s")
+
+    if args.compile:
+        compile_dictionary(dict_path)
+        print(f"Binario compilado para {os.path.basename(dict_path)}")
+
+if __name__ == "__main__":
+    main()
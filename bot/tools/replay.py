@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import difflib
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from bot.config import LOG_PACKETS_FILE
+from bot.utils.logger import logger, packet_logger
+from bot.network.capture import RECV, SEND, read_capture
+from bot.network.server import BotServer
+
+# ========================================
+# WEBSOCKET FALSO
+# ========================================
+class FakeWebSocket:
+    """Sustituto del websocket del userscript que guarda lo que el servidor envía."""
+
+    def __init__(self, conn_id):
+        self.conn_id = conn_id
+        self.remote_address = ("replay", conn_id)
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+# ========================================
+# REPRODUCCIÓN
+# ========================================
+def summarize_action(message):
+    """Reduce un mensaje saliente a una línea comparable."""
+    try:
+        data = json.loads(message)
+    except json.JSONDecodeError:
+        return message
+    if data.get("action") == "plan_tecleo":
+        # Un plan de tecleo termina enviando la palabra: se compara igual que el modo tecla a tecla
+        return f"escribir_palabra {data.get('word', '')}"
+    if "action" in data:
+        value = data.get("word", data.get("text", ""))
+        return f"{data['action']} {value}".rstrip()
+    return data.get("event", message)
+
+def is_relevant(message, include_typing):
+    # Las sondas de latencia y las cancelaciones de planes de tecleo dependen del reloj, no de la partida
+    if '"sonda"' in message or '"cancelar_tecleo"' in message:
+        return False
+    return include_typing or '"teclear_texto"' not in message
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+async def replay(records, speed, seed):
+    """
+    Alimenta los mensajes recibidos de la captura a un BotServer real, con
+    una sesión por conexión capturada.
+    speed=0 reproduce sin esperas; speed=N reproduce N veces más rápido.
+    """
+    random.seed(seed)
+    server = BotServer(persist_changes=False)
+    server.time_scale = 1 / speed if speed else 0
+
+    sockets = {}
+    sessions = {}
+    latencies = defaultdict(list)
+    inbound = [r for r in records if r["dir"] == RECV]
+    if not inbound:
+        return sockets, latencies
+
+    first_ts = inbound[0]["ts"]
+    start = time.perf_counter()
+    for record in inbound:
+        if speed:
+            delay = (record["ts"] - first_ts) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        conn_id = record.get("conn", 0)
+        session = sessions.get(conn_id)
+        if session is None:
+            websocket = sockets[conn_id] = FakeWebSocket(conn_id)
+            session = sessions[conn_id] = server.open_session(websocket)
+            session.conn_id = conn_id
+
+        try:
+            event_type = json.loads(record["msg"]).get("event", "?")
+        except (json.JSONDecodeError, AttributeError):
+            event_type = "?"
+
+        handler_start = time.perf_counter()
+        await server.process_message(session, record["msg"])
+        latencies[event_type].append(time.perf_counter() - handler_start)
+
+        if not speed:
+            # Sin esperas los turnos terminan antes del siguiente evento, como en la captura
+            await server.wait_turn(session)
+
+    for session in sessions.values():
+        await server.wait_turn(session)
+
+    return sockets, latencies
+
+def diff_actions(records, sockets, include_typing):
+    """Compara, por conexión, las acciones capturadas con las reproducidas."""
+    expected = defaultdict(list)
+    for record in records:
+        if record["dir"] == SEND and is_relevant(record["msg"], include_typing):
+            expected[record.get("conn", 0)].append(summarize_action(record["msg"]))
+
+    diffs = {}
+    for conn_id in sorted(set(expected) | set(sockets)):
+        actual = [summarize_action(m) for m in sockets[conn_id].sent if is_relevant(m, include_typing)] if conn_id in sockets else []
+        diff = list(difflib.unified_diff(expected.get(conn_id, []), actual, "capturado", "reproducido", lineterm=""))
+        if diff:
+            diffs[conn_id] = diff
+    return diffs
+
+# ========================================
+# PUNTO DE ENTRADA
+# ========================================
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce una captura de packets.log contra BotServer.")
+    parser.add_argument("capture", nargs="?", default=LOG_PACKETS_FILE, help="Archivo de captura (JSON por línea).")
+    parser.add_argument("--speed", type=float, default=0, help="Factor de velocidad (1 = tiempo real, 0 = sin esperas).")
+    parser.add_argument("--conn", type=int, action="append", help="Reproducir solo estas conexiones.")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla para las elecciones aleatorias del bot.")
+    parser.add_argument("--include-typing", action="store_true", help="Incluir los mensajes de tecleo en la comparación.")
+    parser.add_argument("--output", help="Guarda latencias y diferencias en JSON.")
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    packet_logger.disabled = True
+
+    records = [r for r in read_capture(args.capture) if not args.conn or r.get("conn", 0) in args.conn]
+    records.sort(key=lambda r: r["ts"])
+    print(f"Captura: {args.capture} ({len(records)} paquetes)")
+
+    sockets, latencies = asyncio.run(replay(records, args.speed, args.seed))
+
+    print(f"\n{'evento':<24} {'n':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    summary = {}
+    for event_type, values in sorted(latencies.items()):
+        row = {
+            "count": len(values),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": max(values) * 1000,
+        }
+        summary[event_type] = row
+        print(f"{event_type:<24} {row['count']:>6} {row['p50_ms']:>9.3f} {row['p99_ms']:>9.3f} {row['max_ms']:>9.3f}")
+
+    diffs = diff_actions(records, sockets, args.include_typing)
+    if diffs:
+        for conn_id, diff in diffs.items():
+            print(f"\nConexión #{conn_id}: las acciones difieren")
+            print("\n".join(diff))
+    else:
+        print("\nAcciones idénticas a la captura.")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"latency": summary, "diffs": {str(k): v for k, v in diffs.items()}}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
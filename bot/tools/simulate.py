@@ -0,0 +1,405 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+import zlib
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from bot.config import DICT_DIR
+from bot.utils.logger import logger, packet_logger
+from bot.logic.dictionary import binary_path_for, load_binary, load_text
+from bot.logic.solver import WordSolver
+from bot.network.codec import dumps, loads
+from bot.network.server import BotServer
+
+STRATEGIES = ["random", "longest", "shortest", "alphabet"]
+BONUS_ALPHABET = "abcdefghijlmnopqrstuv"
+MAX_LIVES = 3
+
+# ========================================
+# DICCIONARIO DEL JUEGO
+# ========================================
+class GameDictionary:
+    """
+    Palabras que el juego simulado acepta. Es una copia independiente de la
+    del bot (sus baneos y aprendizajes no la modifican); `invalid_rate`
+    marca al azar, de forma determinista, una fracción de palabras que el
+    juego rechaza para que el bot tenga que reintentar.
+    """
+
+    def __init__(self, language, min_answers, invalid_rate):
+        language, dict_file = WordSolver.resolve_language(language)
+        dict_path = os.path.join(DICT_DIR, dict_file)
+        loaded = load_binary(binary_path_for(dict_path), dict_path)
+        self.words, self.index = loaded or load_text(dict_path)
+        self.language = language
+        self.invalid_threshold = int(invalid_rate * 10000)
+        # Sílabas de 2-3 letras con respuestas suficientes, como las del juego
+        self.syllables = [
+            gram for gram, posting in self.index.postings.items()
+            if len(gram) in (2, 3) and gram.isalpha() and len(posting) >= min_answers
+        ]
+
+    def is_valid(self, word):
+        if self.words.find(word) < 0:
+            return False
+        return zlib.crc32(word.encode("utf-8")) % 10000 >= self.invalid_threshold
+
+    def random_answer(self, syllable, used, rng, attempts=20):
+        """Una respuesta válida y no usada elegida al azar, o None."""
+        posting = self.index.lookup(syllable)
+        for _ in range(min(attempts, len(posting))):
+            word = self.words.word(posting[rng.randrange(len(posting))])
+            if word not in used and self.is_valid(word):
+                return word
+        return None
+
+# ========================================
+# PESTAÑA SIMULADA (USERSCRIPT)
+# ========================================
+class SimulatedTab:
+    """
+    Hace de userscript de un jugador bot: entrega a BotServer los eventos de
+    la sala en orden (como el bucle de recepción del websocket) y ejecuta
+    sus acciones: planes de tecleo, palabras enviadas y sondas.
+    """
+
+    def __init__(self, room, server, peer_id, strategy):
+        self.room = room
+        self.server = server
+        self.peer_id = peer_id
+        self.strategy = strategy
+        self.remote_address = ("simulate", peer_id)
+        self.inbox = asyncio.Queue()
+        self.plans = {}
+        self.session = server.open_session(self)
+        self.pump_task = asyncio.create_task(self._pump())
+
+    def deliver(self, event, data):
+        self.inbox.put_nowait(dumps({"event": event, "data": data}))
+
+    async def _pump(self):
+        while True:
+            message = await self.inbox.get()
+            try:
+                await self.server.process_message(self.session, message)
+            finally:
+                self.inbox.task_done()
+
+    async def send(self, message):
+        """Acciones que BotServer envía al userscript."""
+        data = loads(message)
+        action = data.get("action")
+        if action == "plan_tecleo":
+            self.plans[data["id"]] = asyncio.create_task(self._run_plan(data))
+        elif action == "cancelar_tecleo":
+            task = self.plans.pop(data.get("id"), None)
+            if task:
+                task.cancel()
+        elif action == "escribir_palabra":
+            self.room.submit(self.peer_id, data.get("word", ""))
+        elif action == "sonda":
+            self.deliver("probeReply", {"id": data.get("id")})
+
+    async def _run_plan(self, plan):
+        try:
+            await asyncio.sleep(sum(plan["delays"]) / 1000 * self.room.scale)
+            self.room.submit(self.peer_id, plan["word"])
+            self.deliver("typingPlanDone", {"id": plan["id"], "cancelled": False})
+        finally:
+            self.plans.pop(plan["id"], None)
+
+    async def close(self):
+        for task in list(self.plans.values()):
+            task.cancel()
+        self.pump_task.cancel()
+        self.server.cancel_turn(self.session)
+        await self.server.close_session(self)
+
+# ========================================
+# SALA SIMULADA
+# ========================================
+class SimulatedRoom:
+    """
+    Partidas de BombParty entre jugadores bot (BotServer) y jugadores con
+    guion, con el reloj acelerado `1 / scale` veces. La sílaba se mantiene
+    hasta que alguien acierta; la bomba explota al agotarse la mecha del
+    turno y el jugador pierde una vida.
+    """
+
+    def __init__(self, room_id, server, dictionary, strategies, args, stats):
+        self.room_id = room_id
+        self.server = server
+        self.dictionary = dictionary
+        self.args = args
+        self.scale = server.time_scale
+        self.stats = stats
+        self.rng = random.Random(args.seed + room_id)
+        self.submissions = asyncio.Queue()
+        self.tabs = {}
+        # Jugadores: peer_id -> estrategia del bot o None si es un jugador con guion
+        self.players = {}
+        peer_id = room_id * 100
+        for strategy in strategies:
+            peer_id += 1
+            self.players[peer_id] = strategy
+            self.tabs[peer_id] = SimulatedTab(self, server, peer_id, strategy)
+        for _ in range(args.scripted):
+            peer_id += 1
+            self.players[peer_id] = None
+
+    def broadcast(self, event, data):
+        for tab in self.tabs.values():
+            tab.deliver(event, data)
+
+    def submit(self, peer_id, word):
+        self.submissions.put_nowait((peer_id, word.strip().lower(), time.perf_counter()))
+
+    def manifest(self):
+        return {"name": self.dictionary.language, "bonusAlphabet": {letter: 1 for letter in BONUS_ALPHABET}}
+
+    async def setup(self):
+        rules = {"minTurnDuration": {"value": self.args.min_turn}}
+        for peer_id, tab in self.tabs.items():
+            tab.deliver("clientHello", {"typingPlans": True})
+            tab.deliver("setup", {"selfPeerId": peer_id, "milestone": {"name": "seating", "dictionaryManifest": self.manifest()}, "rules": rules})
+            tab.deliver("configUpdate", {
+                "active": True,
+                "autojoin": False,
+                "strategy_alphabet": tab.strategy == "alphabet",
+                "strategy_longest": tab.strategy == "longest",
+                "strategy_shortest": tab.strategy == "shortest",
+            })
+        await asyncio.gather(*(tab.inbox.join() for tab in self.tabs.values()))
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds * self.scale)
+
+    async def play(self, games):
+        await self.setup()
+        for _ in range(games):
+            await self.play_game()
+        for tab in self.tabs.values():
+            await tab.close()
+
+    async def play_game(self):
+        rng = self.rng
+        lives = {peer_id: 2 for peer_id in self.players}
+        bonus = {peer_id: set(BONUS_ALPHABET) for peer_id in self.players}
+        used = set()
+        order = list(self.players)
+        rng.shuffle(order)
+
+        self.broadcast("setMilestone", [{"name": "seating", "dictionaryManifest": self.manifest()}, time.time()])
+        syllable = rng.choice(self.dictionary.syllables)
+        current = order[0]
+        self.broadcast("setMilestone", [{"name": "round", "currentPlayerPeerId": current, "syllable": syllable, "dictionaryManifest": self.manifest()}, time.time()])
+
+        turns = 0
+        while sum(1 for peer_id in order if lives[peer_id] > 0) > 1 and turns < self.args.max_turns:
+            turns += 1
+            if turns > 1:
+                self.broadcast("nextTurn", [current, syllable, 0])
+            correct = await self.play_turn(current, syllable, used, bonus, lives)
+            self.stats.turns += 1
+            if correct:
+                syllable = rng.choice(self.dictionary.syllables)
+            else:
+                lives[current] -= 1
+                self.broadcast("livesLost", [current, lives[current]])
+                if self.players[current]:
+                    self.stats.explosions[self.players[current]] += 1
+            current = self.next_player(order, current, lives)
+
+        self.stats.games += 1
+        for peer_id, strategy in self.players.items():
+            if strategy:
+                self.stats.record_game(strategy, survived=lives[peer_id] > 0)
+
+    def next_player(self, order, current, lives):
+        i = order.index(current)
+        for step in range(1, len(order) + 1):
+            peer_id = order[(i + step) % len(order)]
+            if lives[peer_id] > 0:
+                return peer_id
+        return current
+
+    async def play_turn(self, peer_id, syllable, used, bonus, lives):
+        """Espera la respuesta del jugador hasta que explote la bomba. Devuelve True si acierta."""
+        args, rng = self.args, self.rng
+        strategy = self.players[peer_id]
+        fuse = rng.uniform(args.min_turn, args.max_fuse)
+        start = time.perf_counter()
+        deadline = start + fuse * self.scale
+
+        while not self.submissions.empty():
+            self.submissions.get_nowait()
+
+        scripted_task = None
+        if strategy is None and rng.random() < args.skill:
+            answer = self.dictionary.random_answer(syllable, used, rng)
+            if answer:
+                scripted_task = asyncio.create_task(self._scripted_answer(peer_id, answer, rng.uniform(args.react_min, args.react_max)))
+
+        try:
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False
+                try:
+                    sender, word, at = await asyncio.wait_for(self.submissions.get(), remaining)
+                except asyncio.TimeoutError:
+                    return False
+                if sender != peer_id or at > deadline:
+                    continue
+
+                reason = None
+                if syllable not in word:
+                    reason = "mustContainSyllable"
+                elif word in used:
+                    reason = "alreadyUsed"
+                elif not self.dictionary.is_valid(word):
+                    reason = "notInDictionary"
+                if reason:
+                    self.broadcast("failWord", [peer_id, reason])
+                    if strategy:
+                        self.stats.rejections[strategy] += 1
+                    continue
+
+                used.add(word)
+                remaining_letters = bonus[peer_id]
+                remaining_letters.difference_update(word)
+                if not remaining_letters:
+                    remaining_letters.update(BONUS_ALPHABET)
+                    lives[peer_id] = min(lives[peer_id] + 1, MAX_LIVES)
+                    self.broadcast("bonusAlphabetCompleted", [peer_id, lives[peer_id]])
+                self.broadcast("setPlayerWord", [peer_id, word, True])
+                bonus_letters = {letter: int(letter in remaining_letters) for letter in BONUS_ALPHABET}
+                self.broadcast("correctWord", [{"playerPeerId": peer_id, "bonusLetters": bonus_letters}])
+                if strategy:
+                    self.stats.latencies[strategy].append((at - start) / self.scale)
+                return True
+        finally:
+            if scripted_task:
+                scripted_task.cancel()
+
+    async def _scripted_answer(self, peer_id, word, delay):
+        await self.sleep(delay)
+        self.submit(peer_id, word)
+
+# ========================================
+# RESULTADOS
+# ========================================
+class SimulationStats:
+    def __init__(self):
+        self.games = 0
+        self.turns = 0
+        self.latencies = defaultdict(list)
+        self.explosions = defaultdict(int)
+        self.rejections = defaultdict(int)
+        self.played = defaultdict(int)
+        self.survived = defaultdict(int)
+
+    def record_game(self, strategy, survived):
+        self.played[strategy] += 1
+        if survived:
+            self.survived[strategy] += 1
+
+    def summary(self, elapsed):
+        strategies = {}
+        for strategy in sorted(self.played):
+            values = sorted(self.latencies[strategy])
+            strategies[strategy] = {
+                "games": self.played[strategy],
+                "survival_rate": self.survived[strategy] / self.played[strategy],
+                "answers": len(values),
+                "explosions": self.explosions[strategy],
+                "rejections": self.rejections[strategy],
+                "latency_p50_s": percentile(values, 50),
+                "latency_p90_s": percentile(values, 90),
+                "latency_p99_s": percentile(values, 99),
+            }
+        return {
+            "games": self.games,
+            "turns": self.turns,
+            "elapsed_s": elapsed,
+            "turns_per_second": self.turns / elapsed if elapsed else 0.0,
+            "strategies": strategies,
+        }
+
+def percentile(values, p):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def print_summary(summary):
+    print(f"\nPartidas: {summary['games']} | Turnos: {summary['turns']} | "
+          f"{summary['turns_per_second']:.1f} turnos/s en {summary['elapsed_s']:.1f}s")
+    print(f"\n{'estrategia':<10} {'partidas':>8} {'superv.':>8} {'resp.':>7} {'expl.':>6} {'rech.':>6} {'p50 s':>7} {'p90 s':>7} {'p99 s':>7}")
+    for strategy, row in summary["strategies"].items():
+        latencies = [f"{row[key]:>7.2f}" if row[key] is not None else f"{'-':>7}" for key in ("latency_p50_s", "latency_p90_s", "latency_p99_s")]
+        print(f"{strategy:<10} {row['games']:>8} {row['survival_rate']:>8.1%} {row['answers']:>7} {row['explosions']:>6} {row['rejections']:>6} {' '.join(latencies)}")
+
+# ========================================
+# PUNTO DE ENTRADA
+# ========================================
+async def simulate(args):
+    server = BotServer(persist_changes=False)
+    server.time_scale = 1 / args.speed
+    dictionary = GameDictionary(args.language, args.min_answers, args.invalid_rate)
+    stats = SimulationStats()
+
+    strategies = args.bots.split(",")
+    rooms = [SimulatedRoom(room_id, server, dictionary, strategies, args, stats) for room_id in range(1, args.rooms + 1)]
+    start = time.perf_counter()
+    await asyncio.gather(*(room.play(args.games) for room in rooms))
+    elapsed = time.perf_counter() - start
+    if server.executor:
+        server.executor.shutdown(wait=True)
+    return stats.summary(elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula salas de BombParty en local contra BotServer.")
+    parser.add_argument("--language", default="English", help="Idioma de las salas.")
+    parser.add_argument("--rooms", type=int, default=4, help="Salas simultáneas.")
+    parser.add_argument("--games", type=int, default=5, help="Partidas por sala.")
+    parser.add_argument("--bots", default="longest,shortest", help=f"Estrategias de los bots de cada sala, separadas por comas ({', '.join(STRATEGIES)}).")
+    parser.add_argument("--scripted", type=int, default=2, help="Jugadores con guion por sala.")
+    parser.add_argument("--skill", type=float, default=0.85, help="Probabilidad de que un jugador con guion responda.")
+    parser.add_argument("--react-min", type=float, default=1.5, help="Tiempo mínimo de respuesta de los jugadores con guion (s).")
+    parser.add_argument("--react-max", type=float, default=7.0, help="Tiempo máximo de respuesta de los jugadores con guion (s).")
+    parser.add_argument("--min-turn", type=float, default=5.0, help="minTurnDuration de la sala (s).")
+    parser.add_argument("--max-fuse", type=float, default=10.0, help="Mecha máxima de la bomba por turno (s).")
+    parser.add_argument("--max-turns", type=int, default=200, help="Turnos máximos por partida.")
+    parser.add_argument("--min-answers", type=int, default=20, help="Respuestas mínimas de las sílabas propuestas.")
+    parser.add_argument("--invalid-rate", type=float, default=0.01, help="Fracción del diccionario que el juego rechaza.")
+    parser.add_argument("--speed", type=float, default=20, help="Aceleración del reloj (1 = tiempo real).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Guarda el resumen en JSON.")
+    args = parser.parse_args()
+
+    unknown = set(args.bots.split(",")) - set(STRATEGIES)
+    if unknown:
+        parser.error(f"Estrategias desconocidas: {', '.join(sorted(unknown))}")
+    if args.speed <= 0:
+        parser.error("--speed debe ser mayor que 0")
+
+    logger.setLevel(logging.WARNING)
+    packet_logger.disabled = True
+    random.seed(args.seed)
+
+    summary = asyncio.run(simulate(args))
+    print_summary(summary)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,21 @@
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
+from logging.handlers import BaseRotatingHandler, QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 from typing import Literal
-from bot.config import LOG_FILE, LOG_PACKETS_FILE, LOG_LEVEL
+from bot.config import (
+    LOG_FILE, LOG_PACKETS_FILE, LOG_LEVEL, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_WHEN, PACKET_CAPTURE,
+)
 
 # ========================================
 # FORMATEADOR CON COLORES ANSI
 # ========================================
 class ColoredFormatter(logging.Formatter):
     """Formateador personalizado con colores ANSI para la terminal."""
-    
+
     GREY = "\x1b[38;5;240m"
     GREEN = "\x1b[32m"
     YELLOW = "\x1b[33m"
@@ -32,6 +39,8 @@ class ColoredFormatter(logging.Formatter):
         if fmt is None:
             fmt = self.FORMAT
         super().__init__(fmt, datefmt, style)
+        # Un formateador por nivel, creado una sola vez
+        self.formatters = {level: logging.Formatter(log_fmt, datefmt=datefmt) for level, log_fmt in self.FORMATS.items()}
 
     def format(self, record):
         msg = record.msg
@@ -40,55 +49,170 @@ class ColoredFormatter(logging.Formatter):
                 return self.CYAN + super().format(record) + self.RESET
             if "[SOLVE]" in msg:
                 return self.BLUE + super().format(record) + self.RESET
-        
-        log_fmt = self.FORMATS.get(record.levelno, self.FORMAT)
-        formatter = logging.Formatter(log_fmt, datefmt=self.datefmt)
+
+        formatter = self.formatters.get(record.levelno)
+        if formatter is None:
+            return super().format(record)
         return formatter.format(record)
 
+class PacketFormatter(logging.Formatter):
+    """Serializa a JSON (en el hilo escritor) los registros de captura, que llegan como dict."""
+
+    def format(self, record):
+        if isinstance(record.msg, dict):
+            return json.dumps(record.msg, ensure_ascii=False)
+        return super().format(record)
+
+# ========================================
+# ESCRITURA EN SEGUNDO PLANO
+# ========================================
+class DeferredQueueHandler(QueueHandler):
+    """
+    Encola el registro sin formatearlo: la fecha, los colores y el JSON de
+    las capturas se generan en el hilo escritor, no en el event loop.
+    """
+
+    def prepare(self, record):
+        if record.args:
+            # Los argumentos podrían cambiar antes de que se escriban
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+def _file_handler(path, formatter):
+    """Archivo con rotación por tiempo (LOG_ROTATE_WHEN) o, si no, por tamaño."""
+    if LOG_ROTATE_WHEN:
+        handler = TimedRotatingFileHandler(path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+    else:
+        handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+    handler.setFormatter(formatter)
+    return handler
+
+class LogPipeline:
+    """
+    Cola compartida por los dos loggers y un único hilo (QueueListener) que
+    escribe en consola y archivos. Tras un fork, el hijo arranca su propio
+    hilo escritor.
+    """
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.routes = {}
+        self.listener = None
+        self.queue_handlers = []
+
+    def attach(self, target_logger, handlers):
+        """Envía los registros de `target_logger` a la cola; `handlers` los escribe el hilo."""
+        queue_handler = DeferredQueueHandler(self.queue)
+        target_logger.addHandler(queue_handler)
+        self.queue_handlers.append(queue_handler)
+        self.routes[target_logger.name] = handlers
+
+    def start(self):
+        self.listener = QueueListener(self.queue, _RoutingHandler(self.routes))
+        self.listener.start()
+
+    def stop(self):
+        """Vacía la cola y detiene el hilo escritor (al salir del proceso)."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        for handlers in self.routes.values():
+            for handler in handlers:
+                handler.flush()
+
+    def use_worker_files(self, worker_id):
+        """
+        Pasa los archivos de log de este proceso a los del trabajador
+        (bot_server.w1.log, packets.w1.log...): la rotación no es segura si
+        varios procesos escriben en el mismo archivo.
+        """
+        if not worker_id:
+            return
+        self.stop()
+        for handlers in self.routes.values():
+            for i, handler in enumerate(handlers):
+                if isinstance(handler, BaseRotatingHandler):
+                    root, ext = os.path.splitext(handler.baseFilename)
+                    handlers[i] = _file_handler(f"{root}.w{worker_id}{ext}", handler.formatter)
+                    handler.close()
+        self.start()
+
+    def restart_in_child(self):
+        # El hilo escritor del padre no existe en el hijo: cola y escritor nuevos
+        self.queue = queue.SimpleQueue()
+        for queue_handler in self.queue_handlers:
+            queue_handler.queue = self.queue
+        self.listener = None
+        self.start()
+
+class _RoutingHandler(logging.Handler):
+    """Entrega cada registro solo a los manejadores del logger que lo emitió."""
+
+    def __init__(self, routes):
+        super().__init__()
+        self.routes = routes
+
+    def handle(self, record):
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
 # ========================================
 # CONFIGURACIÓN DE LOGGERS
 # ========================================
-def setup_logger():
+def setup_logger(pipeline):
     """Configura el logger principal de la aplicación."""
-    
+
     logger = logging.getLogger("JKLM_Bot")
     logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
-    
+
     if logger.handlers:
         return logger
 
     file_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s', datefmt='%H:%M:%S')
-
-    file_handler = logging.FileHandler(LOG_FILE, encoding='utf-8')
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    file_handler = _file_handler(LOG_FILE, file_formatter)
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(ColoredFormatter(datefmt='%H:%M:%S'))
-    logger.addHandler(console_handler)
+
+    pipeline.attach(logger, [file_handler, console_handler])
+    logger.propagate = False
 
     return logger
 
-def setup_packet_logger():
+def setup_packet_logger(pipeline):
     """Configura logger específico para tráfico de red."""
     packet_logger = logging.getLogger("JKLM_Packets")
+    packet_logger.propagate = False
+
+    if not PACKET_CAPTURE:
+        # Sin captura: ni archivo abierto ni registros creados (isEnabledFor devuelve False)
+        packet_logger.disabled = True
+        return packet_logger
+
     packet_logger.setLevel(logging.DEBUG)
-    
+
     if packet_logger.handlers:
         return packet_logger
 
-    formatter = logging.Formatter('%(asctime)s %(message)s', datefmt='%H:%M:%S')
-    
-    file_handler = logging.FileHandler(LOG_PACKETS_FILE, encoding='utf-8')
-    file_handler.setFormatter(formatter)
-    packet_logger.addHandler(file_handler)
-    
-    packet_logger.propagate = False 
-    
+    # Cada mensaje ya es un registro JSON con su propia marca de tiempo
+    file_handler = _file_handler(LOG_PACKETS_FILE, PacketFormatter('%(message)s'))
+    pipeline.attach(packet_logger, [file_handler])
+
     return packet_logger
 
 # ========================================
 # INSTANCIAS GLOBALES
 # ========================================
-logger = setup_logger()
-packet_logger = setup_packet_logger()
+log_pipeline = LogPipeline()
+logger = setup_logger(log_pipeline)
+packet_logger = setup_packet_logger(log_pipeline)
+log_pipeline.start()
+atexit.register(log_pipeline.stop)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=log_pipeline.restart_in_child)
@@ -0,0 +1,45 @@
+import asyncio
+import time
+from collections import deque
+from bot.utils.logger import logger
+
+# ========================================
+# MONITOR DE RETRASO DEL EVENT LOOP
+# ========================================
+class LoopLagMonitor:
+    """
+    Mide cuánto se retrasa el event loop: duerme `interval` segundos y
+    registra cuánto tarda de más en despertar. Un retraso alto significa que
+    algo síncrono está bloqueando todas las conexiones.
+    """
+
+    def __init__(self, interval, warn_ms, window=600):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self.samples = deque(maxlen=window)
+        self.max_ms = 0.0
+        self.stalls = 0
+
+    async def run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - start - self.interval) * 1000)
+            self.samples.append(lag_ms)
+            self.max_ms = max(self.max_ms, lag_ms)
+            if lag_ms >= self.warn_ms:
+                self.stalls += 1
+                logger.warning(f"[LAG] Event loop bloqueado {lag_ms:.0f} ms")
+
+    def stats(self):
+        """Resumen de la ventana reciente (p50/p99 en ms) y máximo histórico."""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"samples": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": self.max_ms, "stalls": self.stalls}
+        return {
+            "samples": len(ordered),
+            "p50_ms": ordered[len(ordered) // 2],
+            "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+            "max_ms": self.max_ms,
+            "stalls": self.stalls,
+        }
@@ -0,0 +1,198 @@
+import bisect
+import json
+import os
+import threading
+import time
+
+# ========================================
+# HISTOGRAMAS Y CONTADORES
+# ========================================
+# Límites (segundos) de los buckets de latencia: de 1 ms a 10 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Ida y vuelta en local: desde 100 µs
+RTT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+class Histogram:
+    """Histograma acumulativo de buckets fijos, como los de Prometheus."""
+
+    __slots__ = ("buckets", "counts", "count", "total")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.count += 1
+        self.total += value
+
+    def cumulative(self):
+        running = 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            yield bound, running
+
+class MetricsRegistry:
+    """
+    Contadores e histogramas etiquetados del proceso. Se actualizan desde el
+    event loop y desde los hilos del solucionador, así que van con cerrojo.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.help = {}
+        self.buckets = {}
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+
+    def describe(self, name, text, buckets=None):
+        self.help[name] = text
+        if buckets:
+            self.buckets[name] = buckets
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets.get(name, LATENCY_BUCKETS))
+            histogram.observe(value)
+
+    def gauge(self, name, func):
+        """Registra un valor que se calcula al exportar (`func` devuelve un número)."""
+        self.gauges[name] = func
+
+    def render_prometheus(self):
+        """Exporta todas las métricas en el formato de texto de Prometheus."""
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+
+        self._render_family(lines, counters, "counter", lambda name, labels, value: [
+            f"{name}{_labels(labels)} {value}"
+        ])
+        self._render_family(lines, histograms, "histogram", lambda name, labels, h: [
+            *(f"{name}_bucket{_labels(labels + (('le', repr(bound)),))} {n}" for bound, n in h.cumulative()),
+            f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {h.count}",
+            f"{name}_sum{_labels(labels)} {h.total}",
+            f"{name}_count{_labels(labels)} {h.count}",
+        ])
+        for name, func in sorted(self.gauges.items()):
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {func()}")
+        return "\n".join(lines) + "\n"
+
+    def _render_family(self, lines, items, kind, render):
+        current = None
+        for (name, labels), value in items:
+            if name != current:
+                current = name
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+            lines.extend(render(name, labels, value))
+
+    def snapshot(self):
+        """Métricas como dict serializable a JSON (percentiles aproximados por bucket)."""
+        with self.lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "sum": h.total,
+                    "p50": _bucket_quantile(h, 0.5),
+                    "p99": _bucket_quantile(h, 0.99),
+                    "buckets": {repr(bound): n for bound, n in h.cumulative()},
+                }
+                for (name, labels), h in sorted(self.histograms.items(), key=lambda item: item[0])
+            ]
+        gauges = {name: func() for name, func in sorted(self.gauges.items())}
+        return {"ts": time.time(), "counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def dump_json(self, path):
+        """Escribe la instantánea de forma atómica (nunca deja un JSON a medias)."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _bucket_quantile(histogram, q):
+    """Límite superior del bucket que contiene el cuantil `q` (None si está vacío o por encima)."""
+    if not histogram.count:
+        return None
+    target = q * histogram.count
+    for bound, n in histogram.cumulative():
+        if n >= target:
+            return bound
+    return None
+
+# ========================================
+# CRONOLOGÍA DE UN TURNO
+# ========================================
+class TurnTimeline:
+    """
+    Marca cada fase de un turno (solve_start, solve_end, first_key, submit,
+    result) como segundos desde que llegó el evento que lo originó, y la
+    registra en el histograma bot_turn_phase_seconds. Cada fase cuenta una
+    sola vez por turno.
+    """
+
+    __slots__ = ("start", "labels", "marks")
+
+    def __init__(self, strategy, language):
+        self.start = time.perf_counter()
+        self.labels = {"strategy": strategy, "language": language or "unknown"}
+        self.marks = {}
+
+    def mark(self, phase):
+        if phase in self.marks:
+            return None
+        elapsed = self.marks[phase] = time.perf_counter() - self.start
+        metrics.observe("bot_turn_phase_seconds", elapsed, phase=phase, **self.labels)
+        return elapsed
+
+# ========================================
+# INSTANCIA GLOBAL
+# ========================================
+metrics = MetricsRegistry()
+metrics.describe("bot_turn_phase_seconds", "Segundos desde el evento que abre el turno hasta cada fase")
+metrics.describe("bot_solve_seconds", "Duración de solve()")
+metrics.describe("bot_turn_results_total", "Resultados de las palabras enviadas por el bot")
+metrics.describe("bot_retries_total", "Reintentos tras una palabra rechazada")
+metrics.describe("bot_bans_total", "Palabras baneadas")
+metrics.describe("bot_learns_total", "Palabras aprendidas")
+metrics.describe("bot_dictionary_loads_total", "Diccionarios cargados desde disco, por origen")
+metrics.describe("bot_dictionary_reloads_total", "Diccionarios recargados en caliente tras cambiar su archivo")
+metrics.describe("bot_turn_deadline_margin_seconds", "Tiempo que quedaba hasta minTurnDuration al enviar la palabra")
+metrics.describe("bot_turn_deadline_misses_total", "Palabras enviadas después de minTurnDuration")
+metrics.describe("bot_turn_compressed_total", "Turnos con pensar/teclear comprimidos para llegar al plazo")
+metrics.describe("bot_sessions", "Conexiones del userscript abiertas")
+metrics.describe("bot_loop_lag_p99_ms", "Retraso p99 del event loop en la ventana reciente (ms)")
+metrics.describe("bot_rtt_seconds", "Ida y vuelta con el userscript (path=userscript) y pings del protocolo (path=websocket)", buckets=RTT_BUCKETS)
+metrics.describe("bot_loop_lag_max_ms", "Retraso máximo del event loop desde el arranque (ms)")
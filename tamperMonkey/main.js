@@ -1,7 +1,7 @@
 // ==UserScript==
 // @name         JKLM Bot - Python Connector
 // @namespace    http://tampermonkey.net/
-// @version      2.0
+// @version      2.4
 // @description  Conecta JKLM.fun con un servidor Python local para automatizar el juego.
 // @author       Alpaca
 // @match        https://jklm.fun/*
@@ -53,6 +53,19 @@
   let lastSetupData = null;
   let pendingInitialConfig = null;
   const PYTHON_URL = "ws://localhost:8765";
+  // Identificador de la pestaña: sobrevive a recargas para que el servidor retome su estado
+  const TAB_ID = (() => {
+    try {
+      let id = sessionStorage.getItem("jklmBotTabId");
+      if (!id) {
+        id = Math.random().toString(36).slice(2) + Date.now().toString(36);
+        sessionStorage.setItem("jklmBotTabId", id);
+      }
+      return id;
+    } catch (e) {
+      return null;
+    }
+  })();
 
   // ========================================
   // GESTIÓN DE CONEXIÓN CON SERVIDOR PYTHON
@@ -64,6 +77,13 @@
       Logger.log("Conectado al servidor Python", "success");
       notificarEstado("Python: Conectado");
 
+      pythonSocket.send(
+        JSON.stringify({
+          event: "clientHello",
+          data: { typingPlans: true, tabId: TAB_ID },
+        })
+      );
+
       if (lastSetupData) {
         Logger.log("Reenviando configuración inicial a Python", "info");
         pythonSocket.send(
@@ -81,6 +101,7 @@
     };
 
     pythonSocket.onclose = () => {
+      cancelarPlanTecleo();
       Logger.log("Desconectado de Python. Reintentando en 3s...", "error");
       notificarEstado("Python: Desconectado");
       setTimeout(connectToPython, 3000);
@@ -97,6 +118,14 @@
   // ========================================
   function procesarOrdenPython(orden) {
 
+    if (orden.action === "sonda") {
+      // Sonda de latencia: contestar en cuanto llega, sin tocar el juego
+      pythonSocket.send(
+        JSON.stringify({ event: "probeReply", data: { id: orden.id } })
+      );
+      return;
+    }
+
     if (orden.event === "initialConfig") {
       const firstElement = document.getElementById("bot-cfg-minTypingDelay");
       if (firstElement) {
@@ -124,12 +153,76 @@
       gameSocket.emit("setWord", texto, false);
     }
 
+    if (orden.action === "plan_tecleo") {
+      ejecutarPlanTecleo(orden);
+    }
+
+    if (orden.action === "cancelar_tecleo") {
+      cancelarPlanTecleo(orden.id);
+    }
+
     if (orden.action === "unirse_juego") {
       Logger.log("Uniéndose a la partida", "python");
       gameSocket.emit("joinRound");
     }
   }
 
+  // ========================================
+  // PLANES DE TECLEO
+  // ========================================
+  // Python envía la palabra y las pausas entre teclas (ms) en un solo
+  // mensaje; aquí se reproducen con temporizadores locales.
+  let planActivo = null;
+
+  function ejecutarPlanTecleo(orden) {
+    cancelarPlanTecleo();
+
+    const plan = { id: orden.id, timer: null };
+    const letras = Array.from(orden.word);
+    const delays = orden.delays || [];
+    let tecleadas = 0;
+    planActivo = plan;
+
+    const paso = () => {
+      if (planActivo !== plan) return;
+
+      if (tecleadas < letras.length) {
+        tecleadas++;
+        gameSocket.emit("setWord", letras.slice(0, tecleadas).join(""), false);
+        plan.timer = setTimeout(paso, delays[tecleadas - 1] || 0);
+        return;
+      }
+
+      planActivo = null;
+      Logger.log(`Enviando palabra: "${orden.word}"`, "python");
+      gameSocket.emit("setWord", orden.word, true);
+      confirmarPlanTecleo(plan.id, false);
+    };
+
+    paso();
+  }
+
+  function cancelarPlanTecleo(id) {
+    if (!planActivo || (id !== undefined && planActivo.id !== id)) return;
+
+    const plan = planActivo;
+    planActivo = null;
+    clearTimeout(plan.timer);
+    Logger.log(`Plan de tecleo #${plan.id} cancelado`, "info");
+    confirmarPlanTecleo(plan.id, true);
+  }
+
+  function confirmarPlanTecleo(id, cancelado) {
+    if (pythonSocket && pythonSocket.readyState === WebSocket.OPEN) {
+      pythonSocket.send(
+        JSON.stringify({
+          event: "typingPlanDone",
+          data: { id: id, cancelled: cancelado },
+        })
+      );
+    }
+  }
+
   // ========================================
   // APLICACIÓN DE CONFIGURACIÓN INICIAL
   // ========================================
@@ -151,7 +244,14 @@
       }
     });
 
-    const booleanFields = ["active", "autojoin", "suicide"];
+    const booleanFields = [
+      "active",
+      "autojoin",
+      "suicide",
+      "strategy_longest",
+      "strategy_alphabet",
+      "strategy_shortest",
+    ];
     booleanFields.forEach((field) => {
       if (config[field] !== undefined) {
         const el = document.getElementById("bot-cfg-" + field);